@@ -2,6 +2,8 @@ from app.db.base import Base
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
 from app.models.task import Task
+from app.models.task_counter import TaskCounter
+from app.models.task_collection_version import TaskCollectionVersion
 from app.core.config import settings
 
 from logging.config import fileConfig
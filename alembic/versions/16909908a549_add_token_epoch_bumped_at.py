@@ -0,0 +1,62 @@
+"""add token epoch bumped at
+
+Revision ID: 16909908a549
+Revises: e3e9f1081920
+Create Date: 2026-10-18 18:21:40.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '16909908a549'
+down_revision: Union[str, None] = 'e3e9f1081920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_epoch_bumped_at', sa.DateTime(timezone=True), nullable=True))
+    # Users bumped before this column existed stay revoked for one more
+    # access-token lifetime
+    op.execute("UPDATE users SET token_epoch_bumped_at = now() WHERE token_epoch > 0")
+    # Stamped on every bump, logout-all included, so workers only reload
+    # epochs that unexpired access tokens can still be older than
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_user_token_epoch() RETURNS trigger AS $$
+        BEGIN
+            IF (NEW.is_active IS FALSE AND OLD.is_active IS NOT FALSE)
+                OR NEW.role IS DISTINCT FROM OLD.role THEN
+                NEW.token_epoch := OLD.token_epoch + 1;
+            END IF;
+            IF NEW.token_epoch IS DISTINCT FROM OLD.token_epoch THEN
+                NEW.token_epoch_bumped_at := now();
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_token_epoch_bumped_at', 'users', ['token_epoch_bumped_at', 'id', 'token_epoch'], unique=False, postgresql_where=sa.text('token_epoch > 0'), postgresql_concurrently=True)
+        op.drop_index('ix_users_bumped_token_epoch', table_name='users', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_bumped_token_epoch', 'users', ['id', 'token_epoch'], unique=False, postgresql_where=sa.text('token_epoch > 0'), postgresql_concurrently=True)
+        op.drop_index('ix_users_token_epoch_bumped_at', table_name='users', postgresql_concurrently=True)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_user_token_epoch() RETURNS trigger AS $$
+        BEGIN
+            IF (NEW.is_active IS FALSE AND OLD.is_active IS NOT FALSE)
+                OR NEW.role IS DISTINCT FROM OLD.role THEN
+                NEW.token_epoch := OLD.token_epoch + 1;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.drop_column('users', 'token_epoch_bumped_at')
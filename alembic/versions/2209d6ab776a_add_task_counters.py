@@ -0,0 +1,40 @@
+"""add task counters
+
+Revision ID: 2209d6ab776a
+Revises: 2c1877cd69c4
+Create Date: 2026-10-18 10:48:20.193746
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2209d6ab776a'
+down_revision: Union[str, None] = '2c1877cd69c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_counters',
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('status', postgresql.ENUM('todo', 'in_progress', 'done', name='task_status', create_type=False), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('owner_id', 'status')
+    )
+    # Backfill; afterwards task_service keeps the counters current
+    op.execute("""
+        INSERT INTO task_counters (owner_id, status, count)
+        SELECT owner_id, status, count(*) FROM tasks
+        WHERE status IS NOT NULL
+        GROUP BY owner_id, status
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('task_counters')
@@ -0,0 +1,42 @@
+"""add task search vector
+
+Revision ID: 2c1877cd69c4
+Revises: e406611a694a
+Create Date: 2026-10-18 10:12:35.664019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c1877cd69c4'
+down_revision: Union[str, None] = 'e406611a694a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gin is a trusted extension (PG13+), so the database owner can
+    # create it; it allows owner_id in the same GIN index as the tsvector
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # Adding a stored generated column rewrites the table once
+    op.add_column('tasks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('idx_task_owner_search', 'tasks', ['owner_id', 'search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_task_owner_search', table_name='tasks', postgresql_using='gin')
+    op.drop_column('tasks', 'search_vector')
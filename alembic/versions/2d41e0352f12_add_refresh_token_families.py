@@ -0,0 +1,31 @@
+"""add refresh token families
+
+Revision ID: 2d41e0352f12
+Revises: c31119caa10b
+Create Date: 2026-10-18 13:02:16.984410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d41e0352f12'
+down_revision: Union[str, None] = 'c31119caa10b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing tokens each start their own family
+    op.add_column('refresh_tokens', sa.Column('family_id', sa.UUID(), nullable=True))
+    op.execute("UPDATE refresh_tokens SET family_id = id")
+    op.alter_column('refresh_tokens', 'family_id', nullable=False)
+    op.create_index(op.f('ix_refresh_tokens_family_id'), 'refresh_tokens', ['family_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refresh_tokens_family_id'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'family_id')
@@ -0,0 +1,46 @@
+"""add user token epochs
+
+Revision ID: 7b3e90a4c5d1
+Revises: 2d41e0352f12
+Create Date: 2026-10-18 13:40:52.117093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e90a4c5d1'
+down_revision: Union[str, None] = '2d41e0352f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+    # Access tokens carry role and epoch; however a user is deactivated or
+    # has their role changed, the epoch moves on and old tokens stop working
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_user_token_epoch() RETURNS trigger AS $$
+        BEGIN
+            IF (NEW.is_active IS FALSE AND OLD.is_active IS NOT FALSE)
+                OR NEW.role IS DISTINCT FROM OLD.role THEN
+                NEW.token_epoch := OLD.token_epoch + 1;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER users_bump_token_epoch
+        BEFORE UPDATE ON users
+        FOR EACH ROW EXECUTE FUNCTION bump_user_token_epoch()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_bump_token_epoch ON users")
+    op.execute("DROP FUNCTION IF EXISTS bump_user_token_epoch()")
+    op.drop_column('users', 'token_epoch')
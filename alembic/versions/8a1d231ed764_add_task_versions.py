@@ -0,0 +1,34 @@
+"""add task versions
+
+Revision ID: 8a1d231ed764
+Revises: 2209d6ab776a
+Create Date: 2026-10-18 11:20:02.871455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a1d231ed764'
+down_revision: Union[str, None] = '2209d6ab776a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Constant default: no table rewrite on PG11+
+    op.add_column('tasks', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.create_table('task_collection_versions',
+    sa.Column('owner_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('task_collection_versions')
+    op.drop_column('tasks', 'version')
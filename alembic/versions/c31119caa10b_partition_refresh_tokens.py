@@ -0,0 +1,100 @@
+"""partition refresh tokens
+
+Revision ID: c31119caa10b
+Revises: fe49ccf6ba1e
+Create Date: 2026-10-18 12:31:09.550827
+
+Opt-in: only converts the table when run with
+    alembic -x partition_refresh_tokens=true upgrade head
+Otherwise it is recorded as applied and changes nothing. To convert later,
+downgrade to fe49ccf6ba1e and upgrade again with the flag.
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c31119caa10b'
+down_revision: Union[str, None] = 'fe49ccf6ba1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tokens live REFRESH_TOKEN_EXPIRE_DAYS; later months are created by
+# python -m app.commands.purge_refresh_tokens
+MONTHS_AHEAD = 2
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def is_partitioned() -> bool:
+    return op.get_bind().scalar(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = 'refresh_tokens'::regclass)"
+    ))
+
+
+def create_indexes() -> None:
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_refresh_tokens_revoked_created_at', 'refresh_tokens', ['created_at'], unique=False, postgresql_where=sa.text('revoked'))
+
+
+def upgrade() -> None:
+    enabled = context.get_x_argument(as_dictionary=True).get('partition_refresh_tokens', '')
+    if enabled.lower() not in ('1', 'true', 'yes') or is_partitioned():
+        return
+
+    # Rows are moved, not rewritten in place: the table is locked for the
+    # copy, so run this in a quiet period. Expired rows are left behind.
+    op.execute("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_unpartitioned")
+    op.execute(
+        "CREATE TABLE refresh_tokens "
+        "(LIKE refresh_tokens_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (expires_at)"
+    )
+    op.execute("CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT")
+    month = datetime.utcnow().date().replace(day=1)
+    for _ in range(MONTHS_AHEAD + 1):
+        op.execute(
+            f"CREATE TABLE refresh_tokens_y{month.year}m{month.month:02d} "
+            f"PARTITION OF refresh_tokens "
+            f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+        )
+        month = next_month(month)
+    op.execute(
+        "INSERT INTO refresh_tokens SELECT * FROM refresh_tokens_unpartitioned "
+        "WHERE expires_at >= now() AT TIME ZONE 'utc'"
+    )
+    op.execute("DROP TABLE refresh_tokens_unpartitioned")
+
+    # Unique constraints on a partitioned table must include the partition
+    # key; digests are unique on their own, so lookups by token_hash still
+    # match at most one row
+    op.create_primary_key('refresh_tokens_pkey', 'refresh_tokens', ['id', 'expires_at'])
+    op.create_foreign_key('refresh_tokens_user_id_fkey', 'refresh_tokens', 'users', ['user_id'], ['id'])
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash', 'expires_at'], unique=True)
+    create_indexes()
+
+
+def downgrade() -> None:
+    if not is_partitioned():
+        return
+
+    op.execute("ALTER TABLE refresh_tokens RENAME TO refresh_tokens_partitioned")
+    op.execute(
+        "CREATE TABLE refresh_tokens "
+        "(LIKE refresh_tokens_partitioned INCLUDING DEFAULTS)"
+    )
+    op.execute("INSERT INTO refresh_tokens SELECT * FROM refresh_tokens_partitioned")
+    op.execute("DROP TABLE refresh_tokens_partitioned")
+
+    op.create_primary_key('refresh_tokens_pkey', 'refresh_tokens', ['id'])
+    op.create_foreign_key('refresh_tokens_user_id_fkey', 'refresh_tokens', 'users', ['user_id'], ['id'])
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=True)
+    create_indexes()
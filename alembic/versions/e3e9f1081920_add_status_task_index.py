@@ -0,0 +1,40 @@
+"""add status task index
+
+Revision ID: e3e9f1081920
+Revises: 7b3e90a4c5d1
+Create Date: 2026-10-18 15:02:17.446310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3e9f1081920'
+down_revision: Union[str, None] = '7b3e90a4c5d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pages order by (created_at, id); with id in the index they need no
+    # sort, and status-filtered pages no longer scan past other statuses.
+    # Scanned backwards for the newest-first order, so no DESC needed. Not
+    # covering: description can outgrow a btree entry.
+    with op.get_context().autocommit_block():
+        op.create_index('idx_task_owner_status_created', 'tasks', ['owner_id', 'status', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('idx_task_owner_created_id', 'tasks', ['owner_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('idx_task_owner_created', table_name='tasks', postgresql_concurrently=True)
+        op.execute('ALTER INDEX idx_task_owner_created_id RENAME TO idx_task_owner_created')
+        op.create_index('ix_users_bumped_token_epoch', 'users', ['id', 'token_epoch'], unique=False, postgresql_where=sa.text('token_epoch > 0'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_bumped_token_epoch', table_name='users', postgresql_concurrently=True)
+        op.create_index('idx_task_owner_created_old', 'tasks', ['owner_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.drop_index('idx_task_owner_created', table_name='tasks', postgresql_concurrently=True)
+        op.execute('ALTER INDEX idx_task_owner_created_old RENAME TO idx_task_owner_created')
+        op.drop_index('idx_task_owner_status_created', table_name='tasks', postgresql_concurrently=True)
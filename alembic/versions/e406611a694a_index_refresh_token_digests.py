@@ -0,0 +1,33 @@
+"""index refresh token digests
+
+Revision ID: e406611a694a
+Revises: 90b2906cfd57
+Create Date: 2026-10-18 09:31:47.205518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e406611a694a'
+down_revision: Union[str, None] = '90b2906cfd57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # token_hash now stores an HMAC-SHA256 digest. Existing rows keep their
+    # bcrypt hash and are still accepted by jti while
+    # REFRESH_TOKEN_ACCEPT_LEGACY_HASHES is on; rows that can never be used
+    # again are dropped so the unique index builds over live tokens only.
+    op.execute(
+        "DELETE FROM refresh_tokens WHERE revoked OR expires_at < now() AT TIME ZONE 'utc'"
+    )
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
@@ -0,0 +1,33 @@
+"""index refresh token expiry
+
+Revision ID: fe49ccf6ba1e
+Revises: 8a1d231ed764
+Create Date: 2026-10-18 12:05:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe49ccf6ba1e'
+down_revision: Union[str, None] = '8a1d231ed764'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # refresh_tokens takes a write on every login and refresh; build the
+    # indexes without blocking them
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_refresh_tokens_revoked_created_at', 'refresh_tokens', ['created_at'], unique=False, postgresql_where=sa.text('revoked'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_refresh_tokens_revoked_created_at', table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_user_id'), table_name='refresh_tokens')
@@ -0,0 +1,46 @@
+import hashlib
+from urllib.parse import urlencode
+
+from fastapi import HTTPException, Request, status
+
+# Revalidate on every use; a matching ETag turns the reply into a 304
+LIST_CACHE_CONTROL = "private, no-cache"
+
+def task_etag(version: int) -> str:
+    return f'"{version}"'
+
+def collection_etag(version: int, request: Request) -> str:
+    # Each page/filter combination is its own representation of the collection
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2s(query.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for tag in if_none_match.split(",")
+    )
+
+def parse_if_match(if_match: str | None) -> int | None:
+    """Task version a client expects from an If-Match header, if any."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        # If-Match uses strong comparison, which a weak tag never passes
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Weak ETags never match If-Match"
+        )
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Unrecognized If-Match ETag"
+        )
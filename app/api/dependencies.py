@@ -1,10 +1,17 @@
+from uuid import UUID
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.security import SECRET_KEY, ALGORITHM
-from app.db.session import SessionLocal
+from app.core.token_epochs import token_epochs
+from app.core.user_cache import get_cached_user, cache_user
+from app.db.replicas import async_read_session, read_session
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -16,24 +23,93 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
+        if payload.get("sub") is None or payload.get("type") == "refresh":
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    return payload
+
+def user_from_claims(payload: dict) -> User | None:
+    """Authorize from the token alone; None for tokens issued without claims."""
+    role, epoch = payload.get("role"), payload.get("epoch")
+    if role is None or not isinstance(epoch, int):
+        return None
+    if token_epochs.is_revoked(payload["sub"], epoch):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    # Deactivation bumps the epoch, so a current token implies an active user
+    return User(id=user_id, role=role, is_active=True)
 
+def ensure_active(user: User):
+    if user.is_active is False:
+        raise HTTPException(status_code=401, detail="User inactive")
     return user
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    payload = decode_access_token(token)
+    user = user_from_claims(payload)
+    if user is not None:
+        return user
+
+    user_id = payload["sub"]
+    user = get_cached_user(user_id)
+    if user is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        cache_user(user)
+
+    return ensure_active(user)
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    payload = decode_access_token(token)
+    user = user_from_claims(payload)
+    if user is not None:
+        return user
+
+    try:
+        user_id = UUID(payload["sub"])
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = get_cached_user(str(user_id))
+    if user is None:
+        user = (await db.scalars(select(User).where(User.id == user_id))).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        cache_user(user)
+
+    return ensure_active(user)
+
+def get_read_db(user: User = Depends(get_current_user)):
+    # A replica, unless it's unhealthy or this user wrote moments ago
+    db = read_session(user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_read_async_db(user: User = Depends(get_current_user_async)):
+    async with async_read_session(user.id) as db:
+        yield db
+
 def require_admin(user: User = Depends(get_current_user)):
     if user.role != "admin":
         raise HTTPException(
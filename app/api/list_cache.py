@@ -0,0 +1,49 @@
+import json
+
+import orjson
+from fastapi import Response
+
+from app.api.conditional import LIST_CACHE_CONTROL, etag_matches
+from app.core.response_cache import response_cache
+from app.services.task_service import TASK_OUT_FIELDS
+
+
+class TaskListResponse(Response):
+    """A list[TaskOut] body encoded with orjson, straight from Core rows.
+
+    Rows carry the TaskOut `fields` to send (plus any extras, which are
+    dropped), so nothing needs validating. Already-encoded bytes, as stored
+    in the response cache, pass through unchanged.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content, fields=TASK_OUT_FIELDS, **kwargs):
+        self.fields = fields
+        super().__init__(content, **kwargs)
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        # Same keys, order and UUID format as TaskOut's own JSON
+        return orjson.dumps([{name: getattr(row, name) for name in self.fields} for row in content])
+
+def task_list_key(user_id, limit: int, offset: int, status: str | None, cursor: str | None, fields) -> str | None:
+    return response_cache.key(user_id, f"{status or ''}|{limit}|{offset}|{cursor or ''}|{','.join(fields)}")
+
+def cached_task_list(key: str | None, if_none_match: str | None) -> Response | None:
+    entry = response_cache.get(key)
+    if entry is None:
+        return None
+    # Entries are the response headers as a JSON line, then the body
+    headers, body = entry.split(b"\n", 1)
+    headers = json.loads(headers)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers={"ETag": headers["ETag"], "Cache-Control": LIST_CACHE_CONTROL})
+    return TaskListResponse(body, headers=headers)
+
+def task_list_response(key: str | None, rows, fields, headers: dict) -> Response:
+    response = TaskListResponse(rows, fields, headers=headers)
+    if key is not None:
+        response_cache.set(key, json.dumps(headers).encode() + b"\n" + response.body)
+    return response
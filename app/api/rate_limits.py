@@ -0,0 +1,58 @@
+import math
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.core.metrics import AUTH_RATE_LIMITED
+from app.core.rate_limit import ACCOUNT_LIMIT, IP_LIMIT, account_key, rate_limiter
+from app.services.auth_service import decode_refresh_token
+
+# Route dependencies, so a rejected request never reaches password hashing
+# in the handler. Behind a proxy, run uvicorn/gunicorn with
+# --forwarded-allow-ips so request.client is the real client.
+
+def enforce(route: str, limit, key: str | None):
+    if key is None:
+        return
+    wait = rate_limiter.wait(limit, key)
+    if wait:
+        AUTH_RATE_LIMITED.labels(route, limit.name).inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(wait))}
+        )
+
+def client_ip(request: Request) -> str | None:
+    return request.client.host if request.client else None
+
+async def json_body(request: Request) -> dict:
+    # Only parses (Starlette keeps the body for the handler); the limiter
+    # calls, which may block on Redis, stay in sync dependencies so they run
+    # in the threadpool rather than on the event loop
+    try:
+        body = await request.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+def limit_register(request: Request, body: dict = Depends(json_body)):
+    enforce("/auth/register", IP_LIMIT, client_ip(request))
+    email = body.get("email")
+    # The same account bucket as login: both are attempts on that address
+    enforce("/auth/register", ACCOUNT_LIMIT, account_key(email) if isinstance(email, str) else None)
+
+def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    # Same form instance the handler gets; FastAPI parses it once
+    enforce("/auth/login", IP_LIMIT, client_ip(request))
+    enforce("/auth/login", ACCOUNT_LIMIT, account_key(form_data.username))
+
+def limit_refresh(request: Request, body: dict = Depends(json_body)):
+    enforce("/auth/refresh", IP_LIMIT, client_ip(request))
+    try:
+        user_id, _ = decode_refresh_token(body.get("refresh_token"))
+    except (ValueError, TypeError, AttributeError, HTTPException):
+        # Malformed or forged: the handler rejects it, and only a verified
+        # token may spend (and so exhaust) an account's bucket
+        return
+    enforce("/auth/refresh", ACCOUNT_LIMIT, user_id)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import require_admin
+from app.core.response_cache import response_cache
+from app.core.security import password_pool
+from app.db.replicas import replicas
+from app.db.session import engine, async_engine
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/stats/password-hashing")
+def password_hashing_stats():
+    # Per worker process: queue wait is submit -> start in the pool
+    return password_pool.stats()
+
+@router.get("/stats/response-cache")
+def response_cache_stats():
+    # Hits and misses are per worker process; evictions come from the backend
+    return response_cache.stats()
+
+@router.get("/stats/db-pool")
+def db_pool_stats():
+    # This worker's pools; wait covers every checkout, including connects
+    return {
+        "sync": engine.pool.snapshot(),
+        "async": async_engine.pool.snapshot() if async_engine is not None else None,
+        "replicas": replicas.snapshot()
+    }
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import get_async_db
+from app.api.rate_limits import limit_login, limit_refresh, limit_register
+from app.schemas.auth import UserCreate, TokenResponse
+from app.services.async_auth_service import register_user, authenticate_user, issue_tokens, refresh_tokens, logout
+
+# Async handlers for DB_ASYNC mode, shadowing the routes in auth.py
+router = APIRouter(prefix="/auth", tags=["auth"], include_in_schema=False)
+
+@router.post("/register", response_model=TokenResponse, dependencies=[Depends(limit_register)])
+async def register(data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = await register_user(db, data.email, data.password, data.name)
+    access, refresh = await issue_tokens(db, user)
+    return {
+        "access_token": access,
+        "refresh_token": refresh
+    }
+
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limit_login)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    # OAuth2PasswordRequestForm uses 'username' field, but we treat it as email
+    user = await authenticate_user(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    access, refresh = await issue_tokens(db, user)
+    return {
+        "access_token": access,
+        "refresh_token": refresh
+    }
+
+@router.post("/refresh", response_model=TokenResponse, dependencies=[Depends(limit_refresh)])
+async def refresh(data: dict, db: AsyncSession = Depends(get_async_db)):
+    refresh_token = data.get("refresh_token")
+    if not refresh_token:
+        raise HTTPException(status_code=400, detail="Refresh token required")
+
+    access, refresh = await refresh_tokens(db, refresh_token)
+    return {
+        "access_token": access,
+        "refresh_token": refresh
+    }
+
+@router.post("/logout", status_code=204)
+async def logout_user(data: dict, db: AsyncSession = Depends(get_async_db)):
+    refresh_token = data.get("refresh_token")
+    if not refresh_token:
+        raise HTTPException(status_code=400, detail="Refresh token required")
+
+    await logout(db, refresh_token)
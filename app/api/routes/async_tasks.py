@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from typing import Literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from app.api.conditional import LIST_CACHE_CONTROL, task_etag, collection_etag, etag_matches, parse_if_match
+from app.api.list_cache import task_list_key, cached_task_list, task_list_response
+from app.api.dependencies import get_current_user_async, get_async_db, get_read_async_db
+from app.core.query_stats import query_budget
+from app.schemas.task import TaskCreate, TaskOut, TaskUpdate
+from app.services.async_task_service import create_task, get_tasks, update_task, delete_task, get_task_collection_version
+from app.services.task_service import TASK_OUT_FIELDS, encode_task_cursor, select_fields
+from app.models.user import User
+
+# Async handlers for DB_ASYNC mode. They shadow the routes of the same path in
+# tasks.py, which stay registered to document the API and serve any endpoint
+# without an async counterpart.
+router = APIRouter(prefix="/tasks", tags=["tasks"], include_in_schema=False)
+
+@router.post("", response_model=TaskOut, dependencies=[Depends(query_budget(4))])
+async def create(
+    data: TaskCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async)
+):
+    task = await create_task(db, user, data.title, data.description, data.status)
+    response.headers["ETag"] = task_etag(task.version)
+    return task
+
+@router.get("", response_model=list[TaskOut], dependencies=[Depends(query_budget(2))])
+async def list_tasks(
+    request: Request,
+    db: AsyncSession = Depends(get_read_async_db),
+    user: User = Depends(get_current_user_async),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    status: Literal["todo", "in_progress", "done"] | None = Query(None),
+    cursor: str | None = Query(None),
+    fields: str | None = Query(None),
+    if_none_match: str | None = Header(None)
+):
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+    selected = select_fields(fields, TASK_OUT_FIELDS)
+
+    key = task_list_key(user.id, limit, offset, status, cursor, selected)
+    if cached := cached_task_list(key, if_none_match):
+        return cached
+
+    etag = collection_etag(await get_task_collection_version(db, user), request)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL})
+
+    tasks = await get_tasks(db, user, limit, offset, status, cursor, selected)
+    headers = {"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL}
+    if len(tasks) == limit:
+        headers["X-Next-Cursor"] = encode_task_cursor(tasks[-1])
+    return task_list_response(key, tasks, selected, headers)
+
+@router.put("/{task_id}", response_model=TaskOut, dependencies=[Depends(query_budget(5))])
+async def update(
+    task_id: UUID,
+    data: TaskUpdate,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+    if_match: str | None = Header(None)
+):
+    task = await update_task(db, user, task_id, data, parse_if_match(if_match))
+    response.headers["ETag"] = task_etag(task.version)
+    return task
+
+@router.delete("/{task_id}", status_code=204, dependencies=[Depends(query_budget(4))])
+async def delete(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async)
+):
+    await delete_task(db, user, task_id)
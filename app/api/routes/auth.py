@@ -3,7 +3,10 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.schemas.auth import UserCreate, TokenResponse
-from app.services.auth_service import register_user, authenticate_user, issue_tokens, refresh_tokens, logout
+from app.api.dependencies import get_current_user
+from app.api.rate_limits import limit_login, limit_refresh, limit_register
+from app.models.user import User
+from app.services.auth_service import register_user, authenticate_user, issue_tokens, refresh_tokens, logout, logout_everywhere
 from app.db.session import SessionLocal
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -15,7 +18,7 @@ def get_db():
     finally:
         db.close()
 
-@router.post("/register", response_model=TokenResponse)
+@router.post("/register", response_model=TokenResponse, dependencies=[Depends(limit_register)])
 def register(data: UserCreate, db: Session = Depends(get_db)):
     user = register_user(db, data.email, data.password, data.name)
     access, refresh = issue_tokens(db, user)
@@ -24,7 +27,7 @@ def register(data: UserCreate, db: Session = Depends(get_db)):
         "refresh_token": refresh
     }
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limit_login)])
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     # OAuth2PasswordRequestForm uses 'username' field, but we treat it as email
     user = authenticate_user(db, form_data.username, form_data.password)
@@ -36,7 +39,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         "refresh_token": refresh
     }
 
-@router.post("/refresh", response_model=TokenResponse)
+@router.post("/refresh", response_model=TokenResponse, dependencies=[Depends(limit_refresh)])
 def refresh(data: dict, db: Session = Depends(get_db)):
     refresh_token = data.get("refresh_token")
     if not refresh_token:
@@ -55,3 +58,8 @@ def logout_user(data: dict, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Refresh token required")
 
     logout(db, refresh_token)
+
+@router.post("/logout-all", status_code=204)
+def logout_all(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # Revokes every access and refresh token the user holds
+    logout_everywhere(db, user)
@@ -1,42 +1,183 @@
-from fastapi import APIRouter, Depends, Query
+from anyio import from_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Literal
 from sqlalchemy.orm import Session
 from uuid import UUID
-from app.api.dependencies import get_current_user, get_db
-from app.schemas.task import TaskCreate, TaskOut, TaskUpdate
-from app.services.task_service import create_task, get_tasks, update_task, delete_task
+from app.api.conditional import LIST_CACHE_CONTROL, task_etag, collection_etag, etag_matches, parse_if_match
+from app.api.list_cache import TaskListResponse, task_list_key, cached_task_list, task_list_response
+from app.api.dependencies import get_current_user, get_db, get_read_db
+from app.core.config import settings
+from app.core.query_stats import query_budget
+from app.schemas.task import TaskCreate, TaskOut, TaskUpdate, TaskBatchRequest, TaskBatchResponse, TaskImportResult, TaskSummary
+from app.services.task_service import (
+    create_task,
+    get_tasks,
+    update_task,
+    delete_task,
+    encode_task_cursor,
+    batch_tasks,
+    search_tasks,
+    encode_search_cursor,
+    get_task_summary,
+    get_task_collection_version,
+    select_fields,
+    TASK_OUT_FIELDS
+)
+from app.services.task_io import EXPORT_FIELDS, export_tasks, import_tasks
 from app.models.user import User
 
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+FIELDS_DESCRIPTION = "Comma-separated subset of id, title, description, status; id is always included"
+
+def iter_request_body(request: Request):
+    # Sync view of the streamed request body for code running in a worker
+    # thread; each chunk is awaited back on the event loop
+    stream = request.stream()
+
+    async def next_chunk():
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    while (chunk := from_thread.run(next_chunk)) is not None:
+        if chunk:
+            yield chunk
+
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
-@router.post("", response_model=TaskOut)
+@router.post("", response_model=TaskOut, dependencies=[Depends(query_budget(4))])
 def create(
     data: TaskCreate,
+    response: Response,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user)
 ):
-    return create_task(db, user, data.title, data.description, data.status)
+    task = create_task(db, user, data.title, data.description, data.status)
+    response.headers["ETag"] = task_etag(task.version)
+    return task
 
-@router.get("", response_model=list[TaskOut])
+@router.get("", response_model=list[TaskOut], responses={304: {"description": "Not Modified"}}, dependencies=[Depends(query_budget(2))])
 def list_tasks(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_current_user),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    status: Literal["todo", "in_progress", "done"] | None = Query(None)
+    status: Literal["todo", "in_progress", "done"] | None = Query(None),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    if_none_match: str | None = Header(None)
+):
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+    selected = select_fields(fields, TASK_OUT_FIELDS)
+
+    key = task_list_key(user.id, limit, offset, status, cursor, selected)
+    if cached := cached_task_list(key, if_none_match):
+        return cached
+
+    # Read the version before the tasks, so the ETag can only be older than
+    # the data it labels, never newer
+    etag = collection_etag(get_task_collection_version(db, user), request)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL})
+
+    tasks = get_tasks(db, user, limit, offset, status, cursor, selected)
+    headers = {"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL}
+    # A full page means there may be more; hand back where to resume
+    if len(tasks) == limit:
+        headers["X-Next-Cursor"] = encode_task_cursor(tasks[-1])
+    return task_list_response(key, tasks, selected, headers)
+
+@router.get("/summary", response_model=TaskSummary, dependencies=[Depends(query_budget(1))])
+def summary(
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user)
+):
+    return get_task_summary(db, user)
+
+@router.get("/search", response_model=list[TaskOut], dependencies=[Depends(query_budget(1))])
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Web-search style query, e.g. `report -draft`"),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION)
+):
+    selected = select_fields(fields, TASK_OUT_FIELDS)
+    rows = search_tasks(db, user, q, limit, cursor, selected)
+    headers = {}
+    if len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_search_cursor(rows[-1].rank, rows[-1])
+    return TaskListResponse(rows, selected, headers=headers)
+
+@router.get("/export", response_class=StreamingResponse)
+def export(
+    user: User = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    status: Literal["todo", "in_progress", "done"] | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated subset of id, title, description, status, created_at; id is always included")
+):
+    # Validated before the response starts, so a bad list is still a 400
+    selected = select_fields(fields, EXPORT_FIELDS)
+    return StreamingResponse(
+        export_tasks(user.id, status, format, selected),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'}
+    )
+
+@router.post(
+    "/import",
+    response_model=TaskImportResult,
+    responses={400: {"description": "No record in the body could be read"}},
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {media_type: {"schema": {"type": "string"}} for media_type in EXPORT_MEDIA_TYPES.values()}
+    }}
+)
+async def import_(
+    request: Request,
+    user: User = Depends(get_current_user),
+    format: Literal["ndjson", "csv"] = Query("csv")
 ):
-    return get_tasks(db, user, limit, offset, status)
+    # Body is parsed and COPYed incrementally off the event loop
+    return await run_in_threadpool(import_tasks, user.id, iter_request_body(request), format)
 
-@router.put("/{task_id}", response_model=TaskOut)
+@router.post("/batch", response_model=TaskBatchResponse, dependencies=[Depends(query_budget(5))])
+def batch(
+    data: TaskBatchRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    total = len(data.create) + len(data.update) + len(data.delete)
+    if total > settings.TASK_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large (max {settings.TASK_BATCH_MAX_ITEMS} operations)"
+        )
+    if len({item.id for item in data.update}) != len(data.update):
+        raise HTTPException(status_code=400, detail="Duplicate task id in update batch")
+
+    return batch_tasks(db, user, data)
+
+@router.put("/{task_id}", response_model=TaskOut, responses={412: {"description": "If-Match version is stale"}}, dependencies=[Depends(query_budget(5))])
 def update(
     task_id: UUID,
     data: TaskUpdate,
+    response: Response,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: User = Depends(get_current_user),
+    if_match: str | None = Header(None, description="ETag from a previous create/update; update only if unchanged")
 ):
-    return update_task(db, user, task_id, data)
+    task = update_task(db, user, task_id, data, parse_if_match(if_match))
+    response.headers["ETag"] = task_etag(task.version)
+    return task
 
-@router.delete("/{task_id}", status_code=204)
+@router.delete("/{task_id}", status_code=204, dependencies=[Depends(query_budget(4))])
 def delete(
     task_id: UUID,
     db: Session = Depends(get_db),
@@ -0,0 +1,52 @@
+"""Upgrade the database to head, returning at once if it's already there.
+
+`alembic upgrade head` loads env.py and every model before it can tell
+there's nothing to do. This compares the revision in alembic_version with
+the script heads first, over a single connection, and only hands over to
+Alembic when they differ.
+
+Usage:
+    python -m app.commands.migrate [--config alembic.ini] [-x key=value ...]
+"""
+import argparse
+import time
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+
+def current_heads(url: str) -> set[str]:
+    engine = create_engine(url, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            return set(MigrationContext.configure(connection).get_current_heads())
+    finally:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="alembic upgrade head, skipped when already at head")
+    parser.add_argument("--config", default="alembic.ini", help="Alembic config file")
+    parser.add_argument("-x", action="append", default=[], help="Passed to migrations, as with alembic -x")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    config = Config(args.config)
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    current = current_heads(settings.DATABASE_URL)
+    if current == heads:
+        print(f"Database already at head {', '.join(sorted(heads))} (checked in {time.perf_counter() - started:.2f}s)")
+        return
+
+    print(f"Upgrading database from {', '.join(sorted(current)) or 'empty'} to head")
+    # Only needed here, and slow to import
+    from alembic import command
+    config.cmd_opts = argparse.Namespace(x=args.x)
+    command.upgrade(config, "head")
+    print(f"Migrations complete in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
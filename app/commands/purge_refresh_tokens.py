@@ -0,0 +1,199 @@
+"""Delete expired and revoked refresh tokens.
+
+Rows go in small batches, each its own transaction, skipping rows a
+concurrent refresh has locked. If the table is partitioned by expires_at
+(see the c31119caa10b migration), whole expired months are dropped instead
+and partitions for the coming months are created ahead of time; one
+whose locks keep timing out is skipped until the next run.
+
+Usage:
+    python -m app.commands.purge_refresh_tokens [--batch-size N]
+        [--pause SECONDS] [--revoked-retention-hours H] [--months-ahead M]
+"""
+import argparse
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, delete, or_, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.refresh_token import RefreshToken
+
+PARTITION_NAME = re.compile(r"^refresh_tokens_y(\d{4})m(\d{2})$")
+LOCK_NOT_AVAILABLE = "55P03"
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"refresh_tokens_y{month.year}m{month.month:02d}"
+
+def is_partitioned(db: Session) -> bool:
+    return db.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = 'refresh_tokens'::regclass)"
+    ))
+
+def list_partitions(db: Session) -> list[str]:
+    return list(db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'refresh_tokens'::regclass"
+    )))
+
+def default_partition(db: Session) -> str | None:
+    # From the catalog alone: pg_get_expr on a partition's bound would wait
+    # for the very locks the DDL below may time out on
+    return db.scalar(text(
+        "SELECT c.relname FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partdefid "
+        "WHERE p.partrelid = 'refresh_tokens'::regclass"
+    ))
+
+def is_lock_timeout(exc: OperationalError) -> bool:
+    # psycopg2 calls it pgcode, psycopg 3 sqlstate
+    orig = exc.orig
+    return (getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)) == LOCK_NOT_AVAILABLE
+
+def run_partition_ddl(db: Session, statements, attempts: int = 3, retry_pause: float = 5.0):
+    """Run `statements` in one transaction and return their rowcounts.
+
+    Returns None, with everything rolled back, if the locks still weren't
+    granted after `attempts` tries.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            # Partition DDL locks the parent; give up quickly rather than
+            # queue logins and refreshes behind it. SET LOCAL keeps the
+            # timeout off the server connection, which PgBouncer may hand
+            # to another client.
+            db.execute(text("SET LOCAL lock_timeout = '2s'"))
+            rowcounts = [db.execute(text(statement)).rowcount for statement in statements]
+            db.commit()
+            return rowcounts
+        except OperationalError as exc:
+            db.rollback()
+            if not is_lock_timeout(exc):
+                raise
+            print(f"Lock timeout ({attempt}/{attempts}): {statements[0]}", file=sys.stderr)
+            if attempt < attempts:
+                time.sleep(retry_pause)
+    return None
+
+def create_partition_statements(month: date, default: str | None) -> list[str]:
+    name = partition_name(month)
+    bounds = f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+    if default is None:
+        return [f'CREATE TABLE "{name}" PARTITION OF refresh_tokens {bounds}']
+    # Attaching a range the default partition already holds rows for fails,
+    # so the new table takes those rows over first
+    return [
+        f'CREATE TABLE "{name}" (LIKE refresh_tokens INCLUDING DEFAULTS)',
+        f'WITH moved AS (DELETE FROM "{default}" '
+        f"WHERE expires_at >= '{month}' AND expires_at < '{next_month(month)}' RETURNING *) "
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        f'ALTER TABLE refresh_tokens ATTACH PARTITION "{name}" {bounds}'
+    ]
+
+def maintain_partitions(
+    db: Session,
+    now: datetime,
+    months_ahead: int,
+    retry_pause: float = 5.0
+) -> tuple[int, int, int]:
+    """Drop fully expired monthly partitions and create upcoming ones.
+
+    Returns (dropped, created, skipped); a partition is skipped when its
+    locks time out on every attempt, and the next run tries again.
+    """
+    existing = set(list_partitions(db))
+    default = default_partition(db)
+    db.commit()
+
+    dropped = skipped = 0
+    for name in sorted(existing):
+        match = PARTITION_NAME.match(name)
+        if match and next_month(date(int(match[1]), int(match[2]), 1)) <= now.date():
+            if run_partition_ddl(db, [f'DROP TABLE "{name}"'], retry_pause=retry_pause) is None:
+                print(f"Skipped dropping {name}", file=sys.stderr)
+                skipped += 1
+            else:
+                dropped += 1
+
+    created = 0
+    month = now.date().replace(day=1)
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            rowcounts = run_partition_ddl(db, create_partition_statements(month, default), retry_pause=retry_pause)
+            if rowcounts is None:
+                print(f"Skipped creating {name}", file=sys.stderr)
+                skipped += 1
+            else:
+                created += 1
+                if default is not None and rowcounts[1]:
+                    print(f"Moved {rowcounts[1]} tokens from {default} into {name}")
+        month = next_month(month)
+
+    return dropped, created, skipped
+
+def purge_batch_query(now: datetime, revoked_before: datetime, batch_size: int):
+    doomed = (
+        select(RefreshToken.id)
+        .where(or_(
+            RefreshToken.expires_at < now,
+            # Revoked rows are kept a while so replays of a rotated token
+            # can still be recognised
+            and_(RefreshToken.revoked == True, RefreshToken.created_at < revoked_before)
+        ))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return delete(RefreshToken).where(RefreshToken.id.in_(doomed))
+
+def purge_refresh_tokens(
+    db: Session,
+    batch_size: int = 1000,
+    pause: float = 0.0,
+    revoked_retention: timedelta = timedelta(hours=24)
+) -> int:
+    now = datetime.utcnow()
+    query = purge_batch_query(now, now - revoked_retention, batch_size)
+
+    deleted = 0
+    while True:
+        rows = db.execute(query, execution_options={"synchronize_session": False}).rowcount
+        db.commit()
+        deleted += rows
+        if rows < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge expired and revoked refresh tokens")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per transaction")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--revoked-retention-hours", type=float, default=24, help="Keep revoked tokens this long")
+    parser.add_argument("--months-ahead", type=int, default=2, help="Monthly partitions to create ahead")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if is_partitioned(db):
+            dropped, created, skipped = maintain_partitions(db, datetime.utcnow(), args.months_ahead)
+            print(f"Dropped {dropped} expired partitions, created {created}, skipped {skipped}")
+        deleted = purge_refresh_tokens(
+            db,
+            args.batch_size,
+            args.pause,
+            timedelta(hours=args.revoked_retention_hours)
+        )
+    finally:
+        db.close()
+    print(f"Deleted {deleted} refresh tokens")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Rebuild task_counters from the tasks table.
+
+Usage:
+    python -m app.commands.rebuild_task_counters [--owner USER_ID]
+"""
+import argparse
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+
+def rebuild_task_counters(db: Session, owner_id=None):
+    # Block counter writers while we recount; their task writes stay
+    # uncommitted (and uncounted here) and apply their deltas afterwards
+    db.execute(text("LOCK TABLE task_counters IN EXCLUSIVE MODE"))
+
+    clear = delete(TaskCounter)
+    counts = (
+        select(Task.owner_id, Task.status, func.count())
+        .where(Task.status.is_not(None))
+        .group_by(Task.owner_id, Task.status)
+    )
+    if owner_id is not None:
+        clear = clear.where(TaskCounter.owner_id == owner_id)
+        counts = counts.where(Task.owner_id == owner_id)
+
+    db.execute(clear)
+    result = db.execute(
+        insert(TaskCounter).from_select(
+            [TaskCounter.owner_id, TaskCounter.status, TaskCounter.count],
+            counts
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild per-user task counters")
+    parser.add_argument("--owner", type=UUID, help="Only rebuild this user's counters")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_task_counters(db, args.owner)
+    finally:
+        db.close()
+    print(f"Rebuilt {rows} task counter rows")
+
+if __name__ == "__main__":
+    main()
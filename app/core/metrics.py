@@ -0,0 +1,170 @@
+"""Prometheus metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set (as under gunicorn), every worker writes
+its samples to that directory and /metrics aggregates all of them. The
+directory must exist and be emptied before the workers start.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from prometheus_client import REGISTRY
+
+from app.core.startup import startup_timer
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last body byte sent",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size",
+    ["method", "route"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Pooled connections by state (checked_out, idle, overflow)",
+    ["engine", "state"],
+    multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time to check a connection out of the pool",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT",
+    ["engine"]
+)
+DB_REPLICA_UP = Gauge(
+    "db_replica_up",
+    "1 while a read replica passes its health and lag checks",
+    ["replica"],
+    multiprocess_mode="livemin"
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag seen by the last health check",
+    ["replica"],
+    multiprocess_mode="livemax"
+)
+DB_READ_ROUTES = Counter(
+    "db_read_routes_total",
+    "Read sessions by target (replica, primary_recent_write, primary_fallback)",
+    ["target"]
+)
+
+PASSWORD_HASH_OPERATIONS = Counter(
+    "password_hash_operations_total",
+    "bcrypt hash/verify operations completed",
+    ["operation"]
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "bcrypt time per operation, excluding queue wait",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1, 2)
+)
+PASSWORD_HASH_ERRORS = Counter(
+    "password_hash_errors_total",
+    "bcrypt hash/verify operations that raised or never ran",
+    ["operation"]
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Sign-ins rejected with 503 because the hashing queue was full"
+)
+
+AUTH_RATE_LIMITED = Counter(
+    "auth_rate_limited_total",
+    "Auth requests rejected with 429, by route and bucket (ip, account)",
+    ["route", "limit"]
+)
+TOKEN_REFRESHES = Counter(
+    "token_refreshes_total",
+    "POST /auth/refresh outcomes",
+    ["result"]
+)
+
+STARTUP_SECONDS = Gauge(
+    "app_startup_seconds",
+    "Per process: seconds to import the app, to finish startup and to serve the first request",
+    ["phase"],
+    multiprocess_mode="livemax"
+)
+
+def render_metrics() -> tuple[bytes, str]:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """Per-route latency, size and in-flight metrics.
+
+    Labelled by route template (e.g. /tasks/{task_id}) so cardinality stays
+    bounded; requests that match no route share the "unmatched" label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status = 500
+        size = 0
+        # The route is only known once routing has run
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(size)
+            startup_timer.request_served()
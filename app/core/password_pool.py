@@ -0,0 +1,190 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Module-level so they can be pickled into the worker processes
+
+def bcrypt_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def bcrypt_verify(plain: str, hashed: str) -> bool:
+    return pwd_context.verify(plain, hashed)
+
+def _metrics():
+    # Imported lazily: the spawned bcrypt workers import this module too and
+    # must not write Prometheus samples of their own
+    from app.core import metrics
+    return metrics
+
+def pool_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent sign-ins, retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+def _timed(fn, args, submitted_at: float):
+    started_at = time.time()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+class PasswordHashPool:
+    """Runs bcrypt in a bounded process pool with fail-fast admission control.
+
+    At most `workers + queue_depth` jobs are admitted at once; further jobs are
+    rejected with 503 instead of tying up request threads behind a backlog.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + queue_depth)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "completed": 0,
+            "failed": 0,
+            "pool_restarts": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+        }
+
+    def _get_executor(self):
+        # Created lazily so each gunicorn worker owns its pool (never across fork)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _discard_executor(self, executor):
+        # A bcrypt process died (OOM killer, segfault) and took the pool with
+        # it: every later submit would fail, so the next one starts afresh
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self._stats["pool_restarts"] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            _metrics().PASSWORD_HASH_REJECTED.inc()
+            raise pool_busy()
+        with self._lock:
+            self._stats["in_flight"] += 1
+
+    def _release(self, fn, queue_wait: float = 0.0, hash_time: float = 0.0, failed: bool = False):
+        self._slots.release()
+        operation = fn.__name__.removeprefix("bcrypt_")
+        metrics = _metrics()
+        if failed:
+            # Raised, cancelled or never submitted: no result, no timings
+            metrics.PASSWORD_HASH_ERRORS.labels(operation).inc()
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                self._stats["failed"] += 1
+            return
+        metrics.PASSWORD_HASH_OPERATIONS.labels(operation).inc()
+        metrics.PASSWORD_HASH_SECONDS.labels(operation).observe(hash_time)
+        with self._lock:
+            stats = self._stats
+            stats["in_flight"] -= 1
+            stats["completed"] += 1
+            stats["queue_wait_seconds_total"] += queue_wait
+            stats["queue_wait_seconds_max"] = max(stats["queue_wait_seconds_max"], queue_wait)
+            stats["hash_seconds_total"] += hash_time
+            stats["hash_seconds_max"] = max(stats["hash_seconds_max"], hash_time)
+
+    def _submit_to_pool(self, fn, args):
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                return executor, executor.submit(_timed, fn, args, time.time())
+            except BrokenProcessPool:
+                # Retried once, on a new pool; the failed attempt still counts
+                self._discard_executor(executor)
+                _metrics().PASSWORD_HASH_ERRORS.labels(fn.__name__.removeprefix("bcrypt_")).inc()
+                with self._lock:
+                    self._stats["failed"] += 1
+                if attempt:
+                    raise
+
+    def _submit(self, fn, args):
+        self._admit()
+        try:
+            executor, future = self._submit_to_pool(fn, args)
+        except BrokenProcessPool:
+            self._release(fn, failed=True)
+            raise pool_busy()
+        except Exception:
+            self._release(fn, failed=True)
+            raise
+
+        def done(f):
+            if f.cancelled() or f.exception() is not None:
+                if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                    self._discard_executor(executor)
+                self._release(fn, failed=True)
+            else:
+                _, queue_wait, hash_time = f.result()
+                self._release(fn, queue_wait, hash_time)
+
+        future.add_done_callback(done)
+        return future
+
+    def run(self, fn, *args):
+        if self.workers <= 0:
+            # Inline mode still applies admission control
+            self._admit()
+            try:
+                result, queue_wait, hash_time = _timed(fn, args, time.time())
+            except BaseException:
+                self._release(fn, failed=True)
+                raise
+            self._release(fn, queue_wait, hash_time)
+            return result
+        try:
+            return self._submit(fn, args).result()[0]
+        except BrokenProcessPool:
+            # Lost with a dying process; the pool is replaced for the retry
+            raise pool_busy()
+
+    async def run_async(self, fn, *args):
+        if self.workers <= 0:
+            return await asyncio.to_thread(self.run, fn, *args)
+        try:
+            result, _, _ = await asyncio.wrap_future(self._submit(fn, args))
+        except BrokenProcessPool:
+            raise pool_busy()
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = self.workers
+        stats["queue_depth"] = self.queue_depth
+        return stats
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
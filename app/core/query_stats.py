@@ -0,0 +1,120 @@
+"""Per-request SQL accounting.
+
+Engine event hooks add every statement's count and duration to the
+QueryStats of the request being served (carried in a ContextVar, so it
+follows the request into the threadpool). The middleware reports them in
+a Server-Timing header and enforces the route's query budget, if any.
+"""
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.slow_query")
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.budget = None
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+_current = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+def redact(parameters, executemany: bool = False):
+    # Keep the shape for debugging, never the values
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return "<redacted>"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # On the statement's own execution context, which is dropped with it: a
+    # statement that fails never reaches after_cursor_execute, and a
+    # per-connection stack would then pair later statements with its start
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0 and elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_logger.warning(
+            "Slow query (%.1f ms): %s; parameters: %s",
+            elapsed * 1000,
+            statement,
+            redact(parameters, executemany)
+        )
+
+def instrument_engine(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(max_queries: int):
+    """Route dependency declaring how many SQL statements the route may run."""
+    async def set_budget():
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = max_queries
+    return set_budget
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.SQL_SERVER_TIMING:
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"server-timing", stats.server_timing().encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+        if stats.budget is not None and stats.count > stats.budget:
+            route = getattr(scope.get("route"), "path", scope["path"])
+            message = f"{scope['method']} {route} ran {stats.count} queries (budget {stats.budget})"
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
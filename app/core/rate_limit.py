@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import threading
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimit:
+    """A token bucket: `burst` requests at once, refilled at `per_minute`."""
+
+    def __init__(self, name: str, burst: int, per_minute: float):
+        self.name = name
+        self.burst = burst
+        self.rate = per_minute / 60
+
+    @property
+    def enabled(self) -> bool:
+        return self.burst > 0 and self.rate > 0
+
+    @property
+    def refill_seconds(self) -> float:
+        # An untouched bucket is full again after this long
+        return self.burst / self.rate
+
+
+class MemoryRateLimitBackend:
+    """Buckets in this worker only; each gunicorn worker allows the full rate."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, limit: RateLimit, key: str) -> float:
+        """Take a token; 0 if allowed, else seconds until one is available."""
+        with self._lock:
+            # Expired entries are full buckets, so they can simply be dropped
+            buckets = self._buckets.get(limit.name)
+            if buckets is None:
+                buckets = self._buckets[limit.name] = TTLCache(self.maxsize, limit.refill_seconds)
+            now = time.monotonic()
+            tokens, updated = buckets.get(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            if tokens < 1:
+                buckets.set(key, (tokens, now))
+                return (1 - tokens) / limit.rate
+            buckets.set(key, (tokens - 1, now))
+            return 0
+
+
+# Refill, take and store in one step, on the Redis clock so every worker
+# (and host) agrees on elapsed time. Returns "0" or the wait in seconds.
+TAKE_TOKEN = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend:
+    """Buckets shared by every worker. `client` is anything speaking the
+    redis-py API with Lua scripting (redis.Redis, or fakeredis for tests)."""
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "taskapi:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_TOKEN)
+
+    def take(self, limit: RateLimit, key: str) -> float:
+        wait = self._take(keys=[f"{self.prefix}{limit.name}:{key}"], args=[limit.burst, limit.rate])
+        return float(wait)
+
+
+class RateLimiter:
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def wait(self, limit: RateLimit, key: str) -> float:
+        """Seconds the caller must wait, or 0 to go ahead (which spends a token)."""
+        if not self.enabled or not limit.enabled:
+            return 0
+        try:
+            wait = self.backend.take(limit, key)
+        except Exception as exc:
+            # Fail open: an unreachable limiter must not take sign-in down
+            logger.warning("Rate limiter unavailable: %s", exc)
+            return 0
+        return wait
+
+
+def account_key(value: str) -> str:
+    # Keeps emails out of the backend's keyspace
+    return hashlib.blake2s(value.strip().lower().encode(), digest_size=16).hexdigest()
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryRateLimitBackend()
+    if name == "redis":
+        # Optional dependency, only needed for the shared backend
+        import redis
+        client = redis.Redis.from_url(settings.RATE_LIMIT_URL, socket_timeout=0.5)
+        return RedisRateLimitBackend(client)
+    return None
+
+
+IP_LIMIT = RateLimit("ip", settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_IP_PER_MINUTE)
+ACCOUNT_LIMIT = RateLimit("account", settings.RATE_LIMIT_ACCOUNT_BURST, settings.RATE_LIMIT_ACCOUNT_PER_MINUTE)
+
+rate_limiter = RateLimiter(create_backend(settings.RATE_LIMIT_BACKEND))
@@ -0,0 +1,57 @@
+import logging
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RecentWrites:
+    """Users who wrote in the last `window` seconds, whose reads must not
+    go to a replica that may not have caught up yet.
+
+    Kept per worker; with a redis `client` the marks are also shared, so a
+    read landing on another worker still sees the write.
+    """
+
+    def __init__(self, window: float, client=None, prefix: str = "taskapi:rw:"):
+        self.window = window
+        self.client = client
+        self.prefix = prefix
+        self._local = TTLCache(100_000, window)
+
+    def mark(self, user_id):
+        if self.window <= 0:
+            return
+        self._local.set(str(user_id), True)
+        if self.client is None:
+            return
+        try:
+            self.client.set(self.prefix + str(user_id), 1, px=int(self.window * 1000))
+        except Exception as exc:
+            logger.warning("Recent write mark failed: %s", exc)
+
+    def is_recent(self, user_id) -> bool:
+        if self.window <= 0:
+            return False
+        if self._local.get(str(user_id)):
+            return True
+        if self.client is None:
+            return False
+        try:
+            return bool(self.client.exists(self.prefix + str(user_id)))
+        except Exception as exc:
+            # Can't tell, so assume the worst and read from the primary
+            logger.warning("Recent write check failed: %s", exc)
+            return True
+
+
+def create_client(name: str):
+    if name == "redis":
+        # Optional dependency, only needed for the shared backend
+        import redis
+        return redis.Redis.from_url(settings.READ_YOUR_WRITES_URL, socket_timeout=0.5)
+    return None
+
+
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS, create_client(settings.READ_YOUR_WRITES_BACKEND))
@@ -0,0 +1,177 @@
+import itertools
+import logging
+import threading
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """In-process LRU; each gunicorn worker has its own copy, so bumps are
+    only seen by the worker that made them (use one worker, or redis)."""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize, ttl)
+        # Bounded like the entries. Generations come from one counter and are
+        # never reused, so a scope whose generation was evicted starts on a
+        # fresh one rather than back on a number its stale entries carry.
+        self._generations = TTLCache(maxsize, ttl)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes):
+        self._entries.set(key, value)
+
+    def generation(self, scope: str) -> int:
+        with self._lock:
+            generation = self._generations.get(scope)
+            if generation is None:
+                generation = next(self._counter)
+                self._generations.set(scope, generation)
+            return generation
+
+    def bump(self, scope: str):
+        with self._lock:
+            self._generations.set(scope, next(self._counter))
+
+    def stats(self):
+        return {"entries": len(self._entries), "evictions": self._entries.evictions}
+
+
+class RedisCacheBackend:
+    """Shared across workers. `client` is anything speaking the redis-py API
+    for get/set/incr (redis.Redis, or a local stand-in such as fakeredis)."""
+
+    name = "redis"
+
+    def __init__(self, client, ttl: float, prefix: str = "taskapi:"):
+        self.client = client
+        self.ttl = max(int(ttl), 1)
+        self.prefix = prefix
+        # As in MemoryCacheBackend, per-scope generations expire and are
+        # drawn from one counter, so an expired one is never handed out
+        # again. Outliving the entries means a scope only loses its
+        # generation once nothing is cached under it.
+        self.generation_ttl = self.ttl * 2
+
+    def get(self, key: str):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def _next_generation(self) -> int:
+        return self.client.incr(f"{self.prefix}gen")
+
+    def generation(self, scope: str) -> int:
+        key = f"{self.prefix}gen:{scope}"
+        generation = self.client.get(key)
+        if generation is None:
+            # Another worker may assign one first; whichever is stored wins
+            self.client.set(key, self._next_generation(), ex=self.generation_ttl, nx=True)
+            generation = self.client.get(key)
+        return int(generation)
+
+    def bump(self, scope: str):
+        self.client.set(f"{self.prefix}gen:{scope}", self._next_generation(), ex=self.generation_ttl)
+
+    def stats(self):
+        try:
+            info = self.client.info("stats")
+        except Exception:
+            return {}
+        return {"evictions": info.get("evicted_keys")}
+
+
+class ResponseCache:
+    """Caches rendered responses per user, invalidated by generation.
+
+    Keys embed the user's current generation; writers bump it after
+    committing, so stale entries are never read again and simply age out of
+    the backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key(self, user_id, params: str) -> str | None:
+        """Cache key for `params` at the user's current generation.
+
+        Take the key before reading the database: if a write lands while the
+        response is being built, it is stored under the old generation and
+        never served.
+        """
+        if not self.enabled:
+            return None
+        try:
+            generation = self.backend.generation(str(user_id))
+        except Exception as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            return None
+        return f"tasks:{user_id}:{generation}:{params}"
+
+    def get(self, key: str | None):
+        if key is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            return None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str | None, value: bytes):
+        if key is None:
+            return
+        try:
+            self.backend.set(key, value)
+        except Exception as exc:
+            logger.warning("Response cache write failed: %s", exc)
+
+    def invalidate(self, user_id):
+        if not self.enabled:
+            return
+        try:
+            self.backend.bump(str(user_id))
+        except Exception as exc:
+            logger.warning("Response cache invalidation failed: %s", exc)
+
+    def stats(self):
+        stats = {
+            "backend": self.backend.name if self.enabled else None,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+        if self.enabled:
+            stats.update(self.backend.stats())
+        return stats
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_SIZE, settings.RESPONSE_CACHE_TTL_SECONDS)
+    if name == "redis":
+        # Optional dependency, only needed for the shared backend
+        import redis
+        client = redis.Redis.from_url(settings.RESPONSE_CACHE_URL, socket_timeout=0.5)
+        return RedisCacheBackend(client, settings.RESPONSE_CACHE_TTL_SECONDS)
+    return None
+
+response_cache = ResponseCache(create_backend(settings.RESPONSE_CACHE_BACKEND))
@@ -1,7 +1,9 @@
+import hashlib
+import hmac
 from datetime import datetime, timedelta
 from jose import jwt
-from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.password_pool import PasswordHashPool, bcrypt_hash, bcrypt_verify
 
 # Use settings from config (loaded from .env)
 SECRET_KEY = settings.SECRET_KEY
@@ -9,17 +11,34 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs in a dedicated process pool so login bursts can't starve the
+# request threadpool; past the queue depth requests fail fast with 503
+password_pool = PasswordHashPool(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_DEPTH
+)
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_pool.run(bcrypt_hash, password)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return password_pool.run(bcrypt_verify, plain, hashed)
 
-def create_access_token(subject: str) -> str:
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run_async(bcrypt_hash, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_pool.run_async(bcrypt_verify, plain, hashed)
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are high-entropy signed JWTs, so a keyed digest is enough
+    # and, unlike bcrypt, is deterministic and therefore indexable
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+def create_access_token(subject: str, role: str = "user", token_epoch: int = 0) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": subject, "exp": expire}
+    # role and epoch let protected routes authorize without a users lookup
+    payload = {"sub": subject, "exp": expire, "role": role, "epoch": token_epoch}
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 def create_refresh_token(subject: str, token_id: str) -> str:
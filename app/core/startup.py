@@ -0,0 +1,52 @@
+import logging
+import sys
+import time
+
+
+def _logger():
+    # The app's own loggers only print warnings. Under gunicorn (including a
+    # preloading master, before any worker exists) its error logger is set
+    # up; otherwise uvicorn's is.
+    return logging.getLogger("gunicorn.error" if "gunicorn" in sys.modules else "uvicorn.error")
+
+
+class StartupTimer:
+    """Per-process startup milestones, in seconds.
+
+    Import time is measured from this module's import, the first thing
+    app.main does. Readiness (lifespan startup done) and the first response
+    are measured from when the process started serving: its import, or with
+    gunicorn --preload, its fork from the master that did the import.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = {}
+        self._served = False
+
+    def _record(self, phase: str, since: float):
+        from app.core.metrics import STARTUP_SECONDS
+        elapsed = time.perf_counter() - since
+        self.seconds[phase] = round(elapsed, 4)
+        STARTUP_SECONDS.labels(phase).set(elapsed)
+        _logger().info("Startup: %s in %.3fs", phase.replace("_", " "), elapsed)
+
+    def imported(self):
+        self._record("import", self.started)
+
+    def forked(self):
+        self.started = time.perf_counter()
+        self.seconds.pop("ready", None)
+        self._served = False
+
+    def ready(self):
+        self._record("ready", self.started)
+
+    def request_served(self):
+        if self._served:
+            return
+        self._served = True
+        self._record("first_request", self.started)
+
+
+startup_timer = StartupTimer()
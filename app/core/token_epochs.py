@@ -0,0 +1,101 @@
+import logging
+import threading
+from datetime import timedelta
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def bumped_epochs_query():
+    # A bump older than the access-token lifetime can't revoke anything: every
+    # token issued before it has expired. Served by the partial index
+    # ix_users_token_epoch_bumped_at.
+    lifetime = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return select(User.id, User.token_epoch).where(
+        User.token_epoch > 0,
+        User.token_epoch_bumped_at > func.now() - lifetime
+    )
+
+
+class TokenEpochMap:
+    """user id -> token_epoch for every user whose epoch was bumped within the
+    access-token lifetime.
+
+    Access tokens carry the epoch they were issued at; one older than the
+    user's entry here has been revoked. Other users are absent (epoch 0): any
+    token older than their last bump has already expired, and the map stays
+    small. Reloaded in the background every TOKEN_EPOCH_REFRESH_SECONDS, or
+    sooner when woken by a user change.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._epochs = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def current(self, user_id: str) -> int:
+        return self._epochs.get(user_id, 0)
+
+    def is_revoked(self, user_id: str, token_epoch: int) -> bool:
+        return token_epoch < self.current(user_id)
+
+    def note(self, user_id, epoch: int):
+        # Apply a bump made by this worker without waiting for the reload
+        with self._lock:
+            epochs = dict(self._epochs)
+            epochs[str(user_id)] = max(epoch, epochs.get(str(user_id), 0))
+            self._epochs = epochs
+
+    def reload(self):
+        db = SessionLocal()
+        try:
+            rows = db.execute(bumped_epochs_query())
+            epochs = {str(user_id): epoch for user_id, epoch in rows}
+        finally:
+            db.close()
+        # Swapped in whole, so readers never see a half-built map
+        with self._lock:
+            self._epochs = epochs
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.reload()
+            except Exception as exc:
+                logger.warning("Token epoch reload failed: %s", exc)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        try:
+            self.reload()
+        except Exception as exc:
+            logger.warning("Initial token epoch load failed: %s", exc)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="token-epoch-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread = None
+
+
+token_epochs = TokenEpochMap(settings.TOKEN_EPOCH_REFRESH_SECONDS)
@@ -0,0 +1,100 @@
+import logging
+import select
+import threading
+from uuid import UUID
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy.engine import make_url
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.token_epochs import token_epochs
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel the users table trigger notifies with the changed user id
+USER_CHANGED_CHANNEL = "user_changed"
+
+# user id -> (role, is_active), local to each worker process
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+
+def get_cached_user(user_id: str):
+    entry = user_cache.get(user_id)
+    if entry is None:
+        return None
+    role, is_active = entry
+    # Detached stand-in carrying just what authorization needs
+    return User(id=UUID(user_id), role=role, is_active=is_active)
+
+def cache_user(user: User):
+    user_cache.set(str(user.id), (user.role, user.is_active))
+
+def invalidate_user(user_id):
+    user_cache.pop(str(user_id))
+
+
+class UserChangeListener(threading.Thread):
+    """LISTENs for user row changes so every worker drops stale cache entries
+    and reloads token epochs promptly."""
+
+    def __init__(self, dsn: str):
+        super().__init__(name="user-cache-listener", daemon=True)
+        self.dsn = dsn
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as exc:
+                logger.warning("User cache listener disconnected: %s", exc)
+            except Exception:
+                # Anything else would end the thread, and with it invalidation
+                # for the life of the worker
+                logger.exception("User cache listener failed; reconnecting")
+            # Notifications may have been missed while disconnected
+            user_cache.clear()
+            token_epochs.wake()
+            self._stopped.wait(5)
+
+    def _listen(self):
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f"LISTEN {USER_CHANGED_CHANNEL}")
+            while not self._stopped.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    invalidate_user(conn.notifies.pop(0).payload)
+                    # The change may have bumped the user's token epoch
+                    token_epochs.wake()
+        finally:
+            conn.close()
+
+    def stop(self):
+        self._stopped.set()
+
+
+_listener = None
+
+def start_user_cache_listener():
+    global _listener
+    # Started even with the user cache disabled: token epoch reloads are
+    # woken by the same notifications
+    if _listener is not None:
+        return
+    # LISTEN needs a session of its own, which PgBouncer transaction
+    # pooling doesn't provide
+    dsn = make_url(settings.DATABASE_LISTEN_URL or settings.DATABASE_URL).set(drivername="postgresql")
+    _listener = UserChangeListener(dsn.render_as_string(hide_password=False))
+    _listener.start()
+
+def stop_user_cache_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import DB_POOL_CONNECTIONS, DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+
+class PoolStats:
+    """Checkout counters for one pool, local to the worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class InstrumentedPoolMixin:
+    # Times every checkout, including opening a new connection when the
+    # pool grows into its overflow
+    label = "sync"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            waited = time.perf_counter() - started
+            self.stats.record(waited, timed_out=True)
+            DB_POOL_TIMEOUTS.labels(self.label).inc()
+            DB_POOL_WAIT.labels(self.label).observe(waited)
+            raise
+        waited = time.perf_counter() - started
+        self.stats.record(waited)
+        DB_POOL_WAIT.labels(self.label).observe(waited)
+        self._update_gauges()
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._update_gauges()
+
+    def _update_gauges(self):
+        DB_POOL_CONNECTIONS.labels(self.label, "checked_out").set(self.checkedout())
+        DB_POOL_CONNECTIONS.labels(self.label, "idle").set(self.checkedin())
+        DB_POOL_CONNECTIONS.labels(self.label, "overflow").set(max(self.overflow(), 0))
+
+    def snapshot(self):
+        stats = self.stats
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_seconds_total": round(stats.wait_seconds_total, 6),
+            "wait_seconds_max": round(stats.wait_seconds_max, 6)
+        }
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncPool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    label = "async"
+
+
+def labelled(pool_class, label: str):
+    # Same pool, reported under its own engine label (e.g. one per replica)
+    return type(pool_class.__name__, (pool_class,), {"label": label})
@@ -0,0 +1,185 @@
+import itertools
+import logging
+import threading
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import DB_READ_ROUTES, DB_REPLICA_LAG, DB_REPLICA_UP
+from app.core.query_stats import instrument_engine
+from app.core.recent_writes import recent_writes
+from app.db.pool import InstrumentedAsyncPool, InstrumentedQueuePool, labelled
+from app.db.session import (
+    AsyncSessionLocal,
+    SessionLocal,
+    async_connect_args,
+    async_database_url,
+    pool_options,
+    sync_connect_args
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind; 0 when it has replayed everything it
+# received (an idle primary would otherwise look like growing lag), and on a
+# server that isn't replicating at all
+LAG_QUERY = text("""
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END,
+        0
+    )
+""")
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = make_url(url)
+        self.healthy = False
+        self.lag = None
+        self.engine = create_engine(
+            url,
+            poolclass=labelled(InstrumentedQueuePool, name),
+            connect_args={
+                "connect_timeout": max(int(settings.READ_REPLICA_CHECK_SECONDS), 1),
+                **sync_connect_args(url)
+            },
+            **pool_options()
+        )
+        instrument_engine(self.engine)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        self.async_engine = None
+        self.async_session_factory = None
+        if settings.DB_ASYNC:
+            self.async_engine = create_async_engine(
+                async_database_url(url),
+                poolclass=labelled(InstrumentedAsyncPool, f"{name}_async"),
+                connect_args=async_connect_args(),
+                **pool_options()
+            )
+            instrument_engine(self.async_engine.sync_engine)
+            self.async_session_factory = async_sessionmaker(
+                autoflush=False,
+                expire_on_commit=False,
+                bind=self.async_engine
+            )
+
+    def check(self, max_lag: float):
+        try:
+            with self.engine.connect() as connection:
+                self.lag = float(connection.execute(LAG_QUERY).scalar())
+            healthy = self.lag <= max_lag
+        except Exception as exc:
+            logger.warning("Replica %s health check failed: %s", self.name, exc)
+            healthy = False
+        if healthy != self.healthy:
+            logger.warning("Replica %s is now %s (lag %s s)", self.name, "up" if healthy else "down", self.lag)
+        self.healthy = healthy
+        DB_REPLICA_UP.labels(self.name).set(int(healthy))
+        if self.lag is not None:
+            DB_REPLICA_LAG.labels(self.name).set(self.lag)
+
+    def dispose_after_fork(self):
+        self.engine.dispose(close=False)
+        if self.async_engine is not None:
+            self.async_engine.sync_engine.dispose(close=False)
+
+    def snapshot(self):
+        return {
+            "host": self.url.host,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "sync": self.engine.pool.snapshot(),
+            "async": self.async_engine.pool.snapshot() if self.async_engine is not None else None
+        }
+
+
+class ReplicaSet:
+    """Read replicas, health-checked in the background.
+
+    Replicas start out unhealthy and only take reads once a check has seen
+    them reachable and within `max_lag`; until then, and whenever none pass,
+    reads go to the primary.
+    """
+
+    def __init__(self, urls, interval: float, max_lag: float):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.interval = interval
+        self.max_lag = max_lag
+        self._next = itertools.count()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def pick(self) -> Replica | None:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def check(self):
+        for replica in self.replicas:
+            replica.check(self.max_lag)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if not self.replicas or self._thread is not None:
+            return
+        self.check()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health-check", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread = None
+
+    def dispose_after_fork(self):
+        for replica in self.replicas:
+            replica.dispose_after_fork()
+
+    def snapshot(self):
+        return [replica.snapshot() for replica in self.replicas]
+
+
+def replica_urls(value: str | None) -> list[str]:
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+replicas = ReplicaSet(
+    replica_urls(settings.READ_DATABASE_URL),
+    settings.READ_REPLICA_CHECK_SECONDS,
+    settings.READ_REPLICA_MAX_LAG_SECONDS
+)
+
+
+def read_replica(user_id) -> Replica | None:
+    """Replica to serve this user's reads from, or None for the primary."""
+    if not replicas.replicas:
+        return None
+    if recent_writes.is_recent(user_id):
+        DB_READ_ROUTES.labels("primary_recent_write").inc()
+        return None
+    replica = replicas.pick()
+    DB_READ_ROUTES.labels("replica" if replica is not None else "primary_fallback").inc()
+    return replica
+
+
+def read_session(user_id):
+    replica = read_replica(user_id)
+    return replica.session_factory() if replica is not None else SessionLocal()
+
+
+def async_read_session(user_id):
+    replica = read_replica(user_id)
+    return replica.async_session_factory() if replica is not None else AsyncSessionLocal()
@@ -1,15 +1,91 @@
+import uuid
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.query_stats import instrument_engine
+from app.db.pool import InstrumentedAsyncPool, InstrumentedQueuePool
+
+def pool_options():
+    # Per engine, per worker process: size the total across workers against
+    # Postgres (or PgBouncer) max_connections
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO
+    }
+
+def sync_connect_args(url: str):
+    if not settings.DB_PGBOUNCER or make_url(url).get_dialect().driver != "psycopg":
+        return {}
+    # psycopg 3 prepares a statement on the server after 5 executions;
+    # through PgBouncer the next execution may land on a server connection
+    # without it. psycopg2 (allowed for replica URLs) never prepares.
+    return {"prepare_threshold": None}
 
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True
+    poolclass=InstrumentedQueuePool,
+    connect_args=sync_connect_args(settings.DATABASE_URL),
+    **pool_options()
 )
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
+
+def async_database_url(url: str):
+    # Same database, asyncpg driver; asyncpg caches prepared statements per
+    # connection, which PgBouncer transaction pooling can't support
+    cache_size = 0 if settings.DB_PGBOUNCER else settings.ASYNCPG_STATEMENT_CACHE_SIZE
+    return (
+        make_url(url)
+        .set(drivername="postgresql+asyncpg")
+        .update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+    )
+
+def async_connect_args():
+    if not settings.DB_PGBOUNCER:
+        return {}
+    # asyncpg still prepares each statement; unique names keep them from
+    # colliding on server connections shared through PgBouncer
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__"
+    }
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        async_database_url(settings.DATABASE_URL),
+        poolclass=InstrumentedAsyncPool,
+        connect_args=async_connect_args(),
+        **pool_options()
+    )
+    instrument_engine(async_engine.sync_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        autoflush=False,
+        expire_on_commit=False,
+        bind=async_engine
+    )
+
+def dispose_after_fork():
+    # With gunicorn --preload, engines are created in the master and
+    # inherited by every worker. close=False drops the inherited connections
+    # without closing them, since the master (or a sibling) may still hold
+    # the same sockets; each worker then opens its own.
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
@@ -1,11 +1,37 @@
-from fastapi import FastAPI
+# First, so the import timing covers everything below
+from app.core.startup import startup_timer
+
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import auth, tasks
+from app.api.routes import admin, auth, tasks, async_auth, async_tasks
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.security import password_pool
+from app.core.token_epochs import token_epochs
+from app.core.user_cache import start_user_cache_listener, stop_user_cache_listener
+from app.db.replicas import replicas
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Started per worker process, after gunicorn forks
+    start_user_cache_listener()
+    token_epochs.start()
+    replicas.start()
+    startup_timer.ready()
+    yield
+    replicas.stop()
+    token_epochs.stop()
+    stop_user_cache_listener()
+    password_pool.shutdown()
 
 app = FastAPI(
     title="Task Management API",
     description="Production-ready backend with JWT auth and token rotation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS - Update origins for production
@@ -15,10 +41,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(QueryStatsMiddleware)
+# Outermost, so latency covers CORS handling and the whole response body
+app.add_middleware(MetricsMiddleware)
+
+# Routes match in registration order, so the async handlers take over their
+# paths while the sync routers keep documenting (and serving) everything else
+if settings.DB_ASYNC:
+    app.include_router(async_auth.router)
+    app.include_router(async_tasks.router)
 
 app.include_router(auth.router)
 app.include_router(tasks.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
@@ -31,3 +68,10 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+startup_timer.imported()
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, ForeignKey, DateTime, Boolean, String
+from sqlalchemy import Column, ForeignKey, DateTime, Boolean, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
@@ -7,10 +7,22 @@ from app.db.base import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Lets the purge job find revoked rows past their retention window
+        Index(
+            "ix_refresh_tokens_revoked_created_at",
+            "created_at",
+            postgresql_where="revoked"
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    token_hash = Column(String, nullable=False)
-    expires_at = Column(DateTime, nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    # Id of the login token this one was rotated from (itself for a login);
+    # reusing a revoked token revokes the whole family
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    # HMAC-SHA256 of the token (legacy rows hold a bcrypt hash)
+    token_hash = Column(String, nullable=False, unique=True, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
     revoked = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,14 +1,20 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Enum, ForeignKey, DateTime, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, String, Enum, ForeignKey, DateTime, Index, Integer
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from app.db.base import Base
 
 class Task(Base):
     __tablename__ = "tasks"
     __table_args__ = (
-        Index("idx_task_owner_created", "owner_id", "created_at"),
+        # Both end in (created_at, id): pages come back in index order, with
+        # or without a status filter, and the keyset cursor seeks on them
+        Index("idx_task_owner_created", "owner_id", "created_at", "id"),
+        Index("idx_task_owner_status_created", "owner_id", "status", "created_at", "id"),
+        # btree_gin lets one GIN index serve owner_id = ? AND search_vector @@ ?
+        Index("idx_task_owner_search", "owner_id", "search_vector", postgresql_using="gin"),
     )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -20,3 +26,14 @@ class Task(Base):
     )
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Incremented on every update; exposed as the task's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Maintained by Postgres; deferred so ordinary task loads don't fetch it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
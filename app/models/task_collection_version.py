@@ -0,0 +1,12 @@
+from sqlalchemy import Column, BigInteger, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class TaskCollectionVersion(Base):
+    """Bumped on every write to a user's tasks; backs list ETags."""
+
+    __tablename__ = "task_collection_versions"
+
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Enum, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+class TaskCounter(Base):
+    """Number of tasks per (owner, status), kept in step by task_service."""
+
+    __tablename__ = "task_counters"
+
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    status = Column(
+        Enum("todo", "in_progress", "done", name="task_status", create_type=False),
+        primary_key=True
+    )
+    count = Column(BigInteger, nullable=False, default=0)
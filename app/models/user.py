@@ -1,11 +1,22 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Index, Integer, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from app.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Only users who were ever revoked; every worker's epoch reload reads
+        # the recently bumped ones
+        Index(
+            "ix_users_token_epoch_bumped_at",
+            "token_epoch_bumped_at",
+            "id",
+            "token_epoch",
+            postgresql_where=text("token_epoch > 0"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False, index=True)
@@ -13,3 +24,8 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     role = Column(Enum("user", "admin", name="user_roles"), default="user")
     is_active = Column(Boolean, default=True)
+    # Bumped to revoke every access token issued so far (log out everywhere,
+    # deactivation, role change)
+    token_epoch = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set by the users_bump_token_epoch trigger whenever token_epoch changes
+    token_epoch_bumped_at = Column(DateTime(timezone=True), nullable=True)
@@ -20,3 +20,36 @@ class TaskUpdate(BaseModel):
     title: str | None = Field(None, min_length=1, max_length=200, example="Updated task title")
     description: str | None = Field(None, max_length=1000, example="Updated task description")
     status: Literal["todo", "in_progress", "done"] | None = Field(None, example="in_progress")
+
+class TaskBatchUpdate(TaskUpdate):
+    id: UUID = Field(..., example="550e8400-e29b-41d4-a716-446655440000")
+
+class TaskBatchRequest(BaseModel):
+    create: list[TaskCreate] = Field(default_factory=list)
+    update: list[TaskBatchUpdate] = Field(default_factory=list)
+    delete: list[UUID] = Field(default_factory=list)
+
+class TaskBatchItemResult(BaseModel):
+    id: UUID
+    status: Literal["created", "updated", "deleted", "not_found"] = Field(..., example="updated")
+    task: Optional[TaskOut] = None
+
+class TaskBatchResponse(BaseModel):
+    create: list[TaskBatchItemResult]
+    update: list[TaskBatchItemResult]
+    delete: list[TaskBatchItemResult]
+
+class TaskImportError(BaseModel):
+    line: int = Field(..., example=3)
+    detail: str = Field(..., example="title: Field required")
+
+class TaskImportResult(BaseModel):
+    accepted: int = Field(..., example=9998)
+    rejected: int = Field(..., example=2)
+    errors: list[TaskImportError]
+
+class TaskSummary(BaseModel):
+    todo: int = Field(..., example=12)
+    in_progress: int = Field(..., example=3)
+    done: int = Field(..., example=40)
+    total: int = Field(..., example=55)
@@ -0,0 +1,95 @@
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import TOKEN_REFRESHES
+from app.models.user import User
+from app.core.security import hash_password_async, verify_password_async, create_access_token
+from app.services.auth_service import (
+    new_refresh_token,
+    rotate_refresh_token_query,
+    refresh_token_state_query,
+    revoke_token_query,
+    revoke_family_query,
+    logout_query,
+    decode_refresh_token,
+    decode_logout_token,
+    token_revoked_or_reused,
+    token_expired,
+    user_inactive
+)
+
+# Async mirror of auth_service for DB_ASYNC mode
+
+async def register_user(db: AsyncSession, email: str, password: str, name: str = None):
+    user = User(
+        email=email,
+        name=name,
+        hashed_password=await hash_password_async(password)
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.scalars(select(User).where(User.email == email))).first()
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return None
+    return user
+
+async def issue_tokens(db: AsyncSession, user: User):
+    if user.is_active is False:
+        raise user_inactive()
+    access = create_access_token(str(user.id), user.role, user.token_epoch)
+    refresh, token = new_refresh_token(user.id)
+    db.add(token)
+    await db.commit()
+
+    return access, refresh
+
+async def reject_refresh(db: AsyncSession, refresh_token: str, token_id, user_id):
+    token = (await db.execute(refresh_token_state_query(refresh_token, token_id, user_id))).first()
+    if token is None:
+        TOKEN_REFRESHES.labels("unknown").inc()
+        raise token_revoked_or_reused()
+    if token.revoked:
+        await db.execute(revoke_family_query(token.family_id))
+        await db.commit()
+        TOKEN_REFRESHES.labels("reused").inc()
+        raise token_revoked_or_reused()
+    if token.is_active is False:
+        TOKEN_REFRESHES.labels("inactive").inc()
+        raise user_inactive()
+
+    await db.execute(revoke_token_query(token.id))
+    await db.commit()
+    TOKEN_REFRESHES.labels("expired").inc()
+    raise token_expired()
+
+async def refresh_tokens(db: AsyncSession, refresh_token: str):
+    user_id, token_id = decode_refresh_token(refresh_token)
+    # asyncpg binds UUID columns from uuid.UUID, not str
+    token_id = UUID(token_id)
+
+    new_refresh, new_token = new_refresh_token(UUID(user_id))
+    rotated = (
+        await db.execute(rotate_refresh_token_query(refresh_token, token_id, UUID(user_id), new_token))
+    ).first()
+    if rotated is None:
+        await db.rollback()
+        await reject_refresh(db, refresh_token, token_id, UUID(user_id))
+    await db.commit()
+    TOKEN_REFRESHES.labels("rotated").inc()
+
+    return create_access_token(user_id, rotated.role, rotated.token_epoch), new_refresh
+
+async def logout(db: AsyncSession, refresh_token: str):
+    token_id = UUID(decode_logout_token(refresh_token))
+
+    if (await db.execute(logout_query(refresh_token, token_id))).first() is None:
+        await db.rollback()
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    await db.commit()
@@ -0,0 +1,104 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.models.user import User
+from app.services.task_service import (
+    TASK_OUT_FIELDS,
+    tasks_query,
+    task_query,
+    task_not_found,
+    apply_task_update,
+    task_counter_upsert,
+    status_change,
+    task_version_bump,
+    task_version_query,
+    conditional_update_query,
+    task_exists_query,
+    tasks_changed,
+    version_mismatch
+)
+
+# Async mirror of task_service for DB_ASYNC mode. Queries are shared with the
+# sync service; sessions use expire_on_commit=False so no refresh is needed.
+
+async def adjust_task_counters(db: AsyncSession, owner_id, deltas: dict):
+    query = task_counter_upsert(owner_id, deltas)
+    if query is not None:
+        await db.execute(query)
+
+async def bump_task_version(db: AsyncSession, owner_id):
+    await db.execute(task_version_bump(owner_id))
+
+async def get_task_collection_version(db: AsyncSession, user: User) -> int:
+    return await db.scalar(task_version_query(user)) or 0
+
+async def create_task(db: AsyncSession, user: User, title: str, description: str, status: str = "todo"):
+    task = Task(
+        title=title,
+        description=description,
+        status=status,
+        owner_id=user.id
+    )
+    db.add(task)
+    await adjust_task_counters(db, user.id, {status: 1})
+    await bump_task_version(db, user.id)
+    await db.commit()
+    tasks_changed(user.id)
+    return task
+
+async def get_tasks(
+    db: AsyncSession,
+    user: User,
+    limit: int = 10,
+    offset: int = 0,
+    status: str | None = None,
+    cursor: str | None = None,
+    fields=TASK_OUT_FIELDS
+):
+    return (await db.execute(tasks_query(user, limit, offset, status, cursor, fields))).all()
+
+async def get_task_or_404(db: AsyncSession, task_id, user: User, for_update: bool = False):
+    task = (await db.scalars(task_query(task_id, user, for_update))).first()
+    if not task:
+        raise task_not_found()
+    return task
+
+async def update_task_if_match(db: AsyncSession, user: User, task_id, data, expected_version: int):
+    task = (
+        await db.execute(
+            conditional_update_query(user, task_id, data, expected_version),
+            execution_options={"synchronize_session": False}
+        )
+    ).first()
+    if task is None:
+        if await db.scalar(task_exists_query(task_id, user)) is None:
+            raise task_not_found()
+        raise version_mismatch()
+
+    await adjust_task_counters(db, user.id, status_change(task.old_status, task.status))
+    await bump_task_version(db, user.id)
+    await db.commit()
+    tasks_changed(user.id)
+    return task
+
+async def update_task(db: AsyncSession, user: User, task_id, data, expected_version: int | None = None):
+    if expected_version is not None:
+        return await update_task_if_match(db, user, task_id, data, expected_version)
+
+    task = await get_task_or_404(db, task_id, user, for_update=True)
+    old_status = task.status
+    apply_task_update(task, data)
+    await adjust_task_counters(db, user.id, status_change(old_status, task.status))
+    await bump_task_version(db, user.id)
+
+    await db.commit()
+    tasks_changed(user.id)
+    return task
+
+async def delete_task(db: AsyncSession, user: User, task_id):
+    task = await get_task_or_404(db, task_id, user, for_update=True)
+    await db.delete(task)
+    await adjust_task_counters(db, user.id, {task.status: -1})
+    await bump_task_version(db, user.id)
+    await db.commit()
+    tasks_changed(user.id)
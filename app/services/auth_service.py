@@ -1,3 +1,4 @@
+from sqlalchemy import and_, insert, literal, or_, select, true, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import uuid
@@ -7,8 +8,12 @@ from fastapi import HTTPException, status
 
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
+from app.core.config import settings
+from app.core.metrics import TOKEN_REFRESHES
+from app.core.token_epochs import token_epochs
 from app.core.security import (
     hash_password,
+    hash_refresh_token,
     verify_password,
     create_access_token,
     create_refresh_token,
@@ -34,25 +39,40 @@ def authenticate_user(db: Session, email: str, password: str):
         return None
     return user
 
-def issue_tokens(db: Session, user: User):
-    access = create_access_token(str(user.id))
-    
+def new_refresh_token(user_id, family_id=None):
     # Create token with unique ID
     token_id = str(uuid.uuid4())
-    refresh = create_refresh_token(str(user.id), token_id)
+    refresh = create_refresh_token(str(user_id), token_id)
 
+    now = datetime.utcnow()
     token = RefreshToken(
         id=uuid.UUID(token_id),
-        user_id=user.id,
-        token_hash=hash_password(refresh),
-        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        user_id=user_id,
+        # A login starts a family; rotations carry it forward
+        family_id=family_id or uuid.UUID(token_id),
+        token_hash=hash_refresh_token(refresh),
+        expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        revoked=False,
+        created_at=now
     )
+    return refresh, token
+
+def user_inactive():
+    return HTTPException(status_code=401, detail="User inactive")
+
+def issue_tokens(db: Session, user: User):
+    # Access tokens are honoured without a users lookup, so an inactive user
+    # must not get one at all
+    if user.is_active is False:
+        raise user_inactive()
+    access = create_access_token(str(user.id), user.role, user.token_epoch)
+    refresh, token = new_refresh_token(user.id)
     db.add(token)
     db.commit()
 
     return access, refresh
 
-def refresh_tokens(db: Session, refresh_token: str):
+def decode_refresh_token(refresh_token: str):
     try:
         payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
@@ -66,54 +86,152 @@ def refresh_tokens(db: Session, refresh_token: str):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    # Find the token by ID
-    matched_token = (
-        db.query(RefreshToken)
-        .filter(
-            RefreshToken.id == token_id,
+    return user_id, token_id
+
+def refresh_token_match(refresh_token: str, token_id):
+    match = RefreshToken.token_hash == hash_refresh_token(refresh_token)
+    # Compatibility window: rows written before digests hold a bcrypt hash,
+    # so find those by jti alone
+    if settings.REFRESH_TOKEN_ACCEPT_LEGACY_HASHES:
+        match = or_(match, RefreshToken.token_hash.like("$2%"))
+    return and_(RefreshToken.id == token_id, match)
+
+def rotate_refresh_token_query(refresh_token: str, token_id, user_id, new_token: RefreshToken):
+    """Revoke the presented token and insert its successor in one statement.
+
+    The UPDATE only matches a live token of an active user, and concurrent
+    rotations of the same token serialize on its row lock, so at most one of
+    them inserts. Returns the user's role and token epoch for the new access
+    token.
+    """
+    rotated = (
+        update(RefreshToken)
+        .where(
+            refresh_token_match(refresh_token, token_id),
             RefreshToken.user_id == user_id,
-            RefreshToken.revoked == False
+            RefreshToken.revoked == False,
+            RefreshToken.expires_at >= datetime.utcnow(),
+            User.id == RefreshToken.user_id,
+            User.is_active.is_not(False)
         )
-        .first()
+        .values(revoked=True)
+        .returning(RefreshToken.family_id, User.role, User.token_epoch)
+        .cte("rotated")
     )
+    columns = [
+        RefreshToken.id,
+        RefreshToken.user_id,
+        RefreshToken.token_hash,
+        RefreshToken.expires_at,
+        RefreshToken.revoked,
+        RefreshToken.created_at
+    ]
+    values = [literal(getattr(new_token, column.key), column.type) for column in columns]
+    inserted = (
+        insert(RefreshToken)
+        .from_select([*columns, RefreshToken.family_id], select(*values, rotated.c.family_id))
+        .returning(RefreshToken.id)
+        .cte("inserted")
+    )
+    return select(rotated.c.role, rotated.c.token_epoch).select_from(rotated.join(inserted, true()))
 
-    if not matched_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token revoked or reused"
-        )
+def refresh_token_state_query(refresh_token: str, token_id, user_id):
+    return (
+        select(RefreshToken.id, RefreshToken.family_id, RefreshToken.revoked, User.is_active)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(refresh_token_match(refresh_token, token_id), RefreshToken.user_id == user_id)
+    )
+
+def revoke_token_query(token_id):
+    return update(RefreshToken).where(RefreshToken.id == token_id).values(revoked=True)
+
+def revoke_family_query(family_id):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked == False)
+        .values(revoked=True)
+    )
+
+def logout_query(refresh_token: str, token_id):
+    # Idempotent: logging out an already revoked token still succeeds
+    return (
+        update(RefreshToken)
+        .where(refresh_token_match(refresh_token, token_id))
+        .values(revoked=True)
+        .returning(RefreshToken.id)
+    )
+
+def token_revoked_or_reused():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token revoked or reused"
+    )
 
-    # Check if token is expired
-    if matched_token.expires_at < datetime.utcnow():
-        matched_token.revoked = True
+def token_expired():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Refresh token expired"
+    )
+
+def reject_refresh(db: Session, refresh_token: str, token_id, user_id):
+    # Only failed rotations pay for this second look at the token
+    token = db.execute(refresh_token_state_query(refresh_token, token_id, user_id)).first()
+    if token is None:
+        TOKEN_REFRESHES.labels("unknown").inc()
+        raise token_revoked_or_reused()
+    if token.revoked:
+        # A rotated or logged-out token came back: assume it leaked and end
+        # every session descended from the same login
+        db.execute(revoke_family_query(token.family_id))
         db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token expired"
-        )
+        TOKEN_REFRESHES.labels("reused").inc()
+        raise token_revoked_or_reused()
+    if token.is_active is False:
+        TOKEN_REFRESHES.labels("inactive").inc()
+        raise user_inactive()
+
+    # Live but not rotated, so it failed the expiry check
+    db.execute(revoke_token_query(token.id))
+    db.commit()
+    TOKEN_REFRESHES.labels("expired").inc()
+    raise token_expired()
 
-    # ROTATION: revoke old token
-    matched_token.revoked = True
+def refresh_tokens(db: Session, refresh_token: str):
+    user_id, token_id = decode_refresh_token(refresh_token)
+
+    new_refresh, new_token = new_refresh_token(uuid.UUID(user_id))
+    rotated = db.execute(
+        rotate_refresh_token_query(refresh_token, token_id, user_id, new_token)
+    ).first()
+    if rotated is None:
+        db.rollback()
+        reject_refresh(db, refresh_token, token_id, user_id)
     db.commit()
+    TOKEN_REFRESHES.labels("rotated").inc()
 
-    # Issue new tokens
-    new_token_id = str(uuid.uuid4())
-    new_access = create_access_token(user_id)
-    new_refresh = create_refresh_token(user_id, new_token_id)
+    return create_access_token(user_id, rotated.role, rotated.token_epoch), new_refresh
 
-    new_token = RefreshToken(
-        id=uuid.UUID(new_token_id),
-        user_id=user_id,
-        token_hash=hash_password(new_refresh),
-        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+def revoke_user_tokens_query(user_id):
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked == False)
+        .values(revoked=True)
     )
 
-    db.add(new_token)
+def logout_everywhere(db: Session, user: User):
+    # Every access token issued so far carries an older epoch, and every
+    # refresh token is revoked
+    epoch = db.scalar(
+        update(User)
+        .where(User.id == user.id)
+        .values(token_epoch=User.token_epoch + 1)
+        .returning(User.token_epoch)
+    )
+    db.execute(revoke_user_tokens_query(user.id))
     db.commit()
+    token_epochs.note(user.id, epoch)
 
-    return new_access, new_refresh
-
-def logout(db: Session, refresh_token: str):
+def decode_logout_token(refresh_token: str):
     try:
         payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
         token_id = payload.get("jti")
@@ -124,13 +242,12 @@ def logout(db: Session, refresh_token: str):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    token = db.query(RefreshToken).filter(
-        RefreshToken.id == token_id,
-        RefreshToken.revoked == False
-    ).first()
+    return token_id
 
-    if token:
-        token.revoked = True
-        db.commit()
-    else:
+def logout(db: Session, refresh_token: str):
+    token_id = decode_logout_token(refresh_token)
+
+    if db.execute(logout_query(refresh_token, token_id)).first() is None:
+        db.rollback()
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    db.commit()
@@ -0,0 +1,260 @@
+import csv
+import io
+import json
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.task import Task
+from app.schemas.task import TaskCreate
+from app.services.task_service import task_counter_upsert, task_version_bump, tasks_changed
+
+EXPORT_COLUMNS = (Task.id, Task.title, Task.description, Task.status, Task.created_at)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+def export_query(owner_id, status: str | None = None, fields=EXPORT_FIELDS):
+    query = select(*(getattr(Task, name) for name in fields)).where(Task.owner_id == owner_id)
+    if status:
+        query = query.where(Task.status == status)
+    return query.order_by(Task.created_at.desc(), Task.id.desc())
+
+def _export_row(row):
+    record = row._asdict()
+    record["id"] = str(record["id"])
+    if record.get("created_at") is not None:
+        record["created_at"] = record["created_at"].isoformat()
+    return record
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(json.dumps(_export_row(row)) + "\n" for row in rows)
+
+def _csv_chunk(rows, fields, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    if header:
+        writer.writeheader()
+    writer.writerows(_export_row(row) for row in rows)
+    return buffer.getvalue()
+
+def export_tasks(owner_id, status: str | None = None, format: str = "ndjson", fields=EXPORT_FIELDS):
+    """Yield a user's tasks as NDJSON or CSV text, one chunk per fetch batch.
+
+    Runs with its own session: request-scoped sessions are closed before a
+    streaming response body is sent. yield_per streams rows from a
+    server-side cursor, so memory stays flat however many tasks there are.
+    """
+    db = SessionLocal()
+    try:
+        if format == "csv":
+            yield _csv_chunk([], fields, header=True)
+
+        result = db.execute(
+            export_query(owner_id, status, fields),
+            execution_options={"yield_per": settings.TASK_EXPORT_BATCH_SIZE}
+        )
+        for rows in result.partitions():
+            yield _csv_chunk(rows, fields) if format == "csv" else _ndjson_chunk(rows)
+    finally:
+        db.close()
+
+
+IMPORT_COLUMNS = ("id", "title", "description", "status", "owner_id", "created_at")
+# Rejected rows beyond this are counted but not described
+MAX_REPORTED_ERRORS = 20
+
+class UnreadableRow(ValueError):
+    """A record that couldn't be decoded or parsed at all."""
+
+
+def _split_lines(data):
+    # On newlines alone, keeping them; splitlines() would also split on \r
+    # and, for text, on separators that CSV fields may contain
+    newline = "\n" if isinstance(data, str) else b"\n"
+    *lines, last = data.split(newline)
+    return [line + newline for line in lines] + ([last] if last else [])
+
+def iter_lines(chunks, invalid: set):
+    """Split a stream of byte chunks into decoded lines, keeping line endings.
+
+    One bad byte costs one line: lines that aren't UTF-8 come back with
+    replacement characters and their numbers are added to `invalid`.
+    """
+    line_no = 0
+
+    def decode_line(number: int, line: bytes) -> str:
+        try:
+            return line.decode("utf-8-sig" if number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            invalid.add(number)
+            return line.decode("utf-8", errors="replace")
+
+    def decode(block: bytes) -> list[str]:
+        nonlocal line_no
+        try:
+            # Whole block at once, the common case
+            lines = _split_lines(block.decode("utf-8-sig" if line_no == 0 else "utf-8"))
+        except UnicodeDecodeError:
+            # Line by line, to find the bad ones
+            lines = [decode_line(number, line) for number, line in enumerate(_split_lines(block), start=line_no + 1)]
+        line_no += len(lines)
+        return lines
+
+    pending = b""
+    for chunk in chunks:
+        # The last piece may be a partial line; keep it for the next chunk
+        data = pending + chunk
+        end = data.rfind(b"\n") + 1
+        pending = data[end:]
+        if end:
+            yield from decode(data[:end])
+    if pending:
+        yield from decode(pending)
+
+def unreadable_file(message: str, rejected: int = 0, errors=()):
+    # Same shape as TaskImportResult, under a message
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"message": message, "accepted": 0, "rejected": rejected, "errors": list(errors)}
+    )
+
+def parse_import_rows(lines, format: str, invalid: set):
+    """Yield (line number, row dict or UnreadableRow) for each record."""
+    if format == "csv":
+        # DictReader pulls lines lazily and stitches quoted multi-line fields
+        reader = csv.DictReader(lines)
+        try:
+            reader.fieldnames
+        except csv.Error as exc:
+            raise unreadable_file(f"Unreadable CSV header: {exc}")
+        if 1 in invalid:
+            raise unreadable_file("CSV header is not valid UTF-8")
+
+        previous = reader.line_num
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The reader resumes at the next line
+                row = UnreadableRow(f"Unreadable CSV: {exc}")
+            else:
+                if invalid and any(line in invalid for line in range(previous + 1, reader.line_num + 1)):
+                    row = UnreadableRow("Not valid UTF-8")
+            previous = reader.line_num
+            yield reader.line_num, row
+
+    for line_no, line in enumerate(lines, start=1):
+        if line_no in invalid:
+            yield line_no, UnreadableRow("Not valid UTF-8")
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else UnreadableRow("Malformed row")
+
+def _error_detail(exc: ValueError) -> str:
+    if isinstance(exc, ValidationError):
+        error = exc.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        return f"{field}: {error['msg']}" if field else error["msg"]
+    return str(exc)
+
+def _copy_field(value) -> str:
+    # COPY csv: unquoted empty is NULL, anything quoted is a literal string
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _copy_chunk(cursor, buffer: io.StringIO):
+    statement = f"COPY tasks ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    # DATABASE_URL uses psycopg 3 (postgresql+psycopg://)
+    with cursor.copy(statement) as copy:
+        copy.write(buffer.getvalue())
+
+def import_tasks(owner_id, chunks, format: str = "csv"):
+    """Validate uploaded rows against TaskCreate and bulk load them with COPY.
+
+    `chunks` is any iterable of bytes, consumed incrementally; accepted rows
+    are sent in COPY batches of TASK_IMPORT_CHUNK_SIZE and committed together.
+    """
+    accepted = rejected = unreadable = 0
+    invalid_lines = set()
+    accepted_by_status = Counter()
+    errors = []
+    buffered = 0
+    buffer = io.StringIO()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for line_no, row in parse_import_rows(iter_lines(chunks, invalid_lines), format, invalid_lines):
+            try:
+                if isinstance(row, UnreadableRow):
+                    raise row
+                # Postgres text can't hold NUL, and COPY would fail the batch
+                if any(isinstance(value, str) and "\x00" in value for value in row.values()):
+                    raise ValueError("NUL characters are not allowed")
+                # Empty CSV cells fall back to the schema defaults
+                task = TaskCreate.model_validate(
+                    {key: value for key, value in row.items() if key and value != ""}
+                )
+            except ValueError as exc:
+                rejected += 1
+                unreadable += isinstance(exc, UnreadableRow)
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_no, "detail": _error_detail(exc)})
+                continue
+
+            buffer.write(",".join(_copy_field(value) for value in (
+                uuid.uuid4(),
+                task.title,
+                task.description,
+                task.status,
+                owner_id,
+                datetime.utcnow().isoformat()
+            )) + "\n")
+            accepted += 1
+            accepted_by_status[task.status] += 1
+            buffered += 1
+
+            if buffered >= settings.TASK_IMPORT_CHUNK_SIZE:
+                _copy_chunk(cursor, buffer)
+                buffer = io.StringIO()
+                buffered = 0
+
+        if rejected and unreadable == rejected and not accepted:
+            # Nothing in it could even be parsed: the wrong file or encoding
+            raise unreadable_file(f"No readable {format} records", rejected, errors)
+
+        if buffered:
+            _copy_chunk(cursor, buffer)
+
+        if accepted:
+            for query in (
+                task_counter_upsert(owner_id, accepted_by_status),
+                task_version_bump(owner_id)
+            ):
+                cursor.execute(str(query.compile(
+                    dialect=engine.dialect,
+                    compile_kwargs={"literal_binds": True}
+                )))
+        connection.commit()
+        if accepted:
+            tasks_changed(owner_id)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    return {"accepted": accepted, "rejected": rejected, "errors": errors}
@@ -1,8 +1,98 @@
+import math
+import uuid
+from collections import Counter
+from datetime import datetime
+from uuid import UUID
+
 from fastapi import HTTPException, status
+from sqlalchemy import Double, Row, String, any_, cast, column, delete, func, insert, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PGUUID, insert as pg_insert
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.recent_writes import recent_writes
+from app.core.response_cache import response_cache
 from app.models.task import Task
+from app.models.task_counter import TaskCounter
+from app.models.task_collection_version import TaskCollectionVersion
 from app.models.user import User
 from sqlalchemy.orm import Session
 
+TASK_STATUSES = ("todo", "in_progress", "done")
+
+# Columns a TaskOut is built from, for RETURNING clauses
+TASK_OUT_COLUMNS = (Task.id, Task.title, Task.description, Task.status)
+TASK_OUT_FIELDS = tuple(column.key for column in TASK_OUT_COLUMNS)
+
+def select_fields(fields: str | None, allowed) -> tuple:
+    """Parse a `fields=` list (e.g. "id,status") into column keys.
+
+    Keys come back in `allowed` order, and id is always included so clients
+    can tell rows apart. No list means every allowed field.
+    """
+    if not fields:
+        return tuple(allowed)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))} (choose from {', '.join(allowed)})"
+        )
+    return tuple(name for name in allowed if name == "id" or name in requested)
+
+def tasks_changed(owner_id):
+    # After commit: drop cached lists, and keep the owner's reads on the
+    # primary until replicas have caught up
+    response_cache.invalidate(owner_id)
+    recent_writes.mark(owner_id)
+
+def task_counter_upsert(owner_id, deltas: dict):
+    """Statement adding `deltas` ({status: +/-n}) to an owner's task counters.
+
+    Run it in the same transaction as the task write it accounts for.
+    Returns None when there is nothing to change.
+    """
+    # Fixed status order so concurrent writers lock counter rows alike
+    rows = [
+        {"owner_id": owner_id, "status": task_status, "count": deltas[task_status]}
+        for task_status in TASK_STATUSES
+        if deltas.get(task_status)
+    ]
+    if not rows:
+        return None
+
+    query = pg_insert(TaskCounter).values(rows)
+    return query.on_conflict_do_update(
+        index_elements=[TaskCounter.owner_id, TaskCounter.status],
+        set_={"count": TaskCounter.count + query.excluded.count}
+    )
+
+def adjust_task_counters(db: Session, owner_id, deltas: dict):
+    query = task_counter_upsert(owner_id, deltas)
+    if query is not None:
+        db.execute(query)
+
+def task_version_bump(owner_id):
+    """Statement bumping the owner's task-collection version (list ETags)."""
+    query = pg_insert(TaskCollectionVersion).values(owner_id=owner_id, version=1)
+    return query.on_conflict_do_update(
+        index_elements=[TaskCollectionVersion.owner_id],
+        set_={"version": TaskCollectionVersion.version + 1}
+    )
+
+def bump_task_version(db: Session, owner_id):
+    db.execute(task_version_bump(owner_id))
+
+def task_version_query(user: User):
+    return select(TaskCollectionVersion.version).where(TaskCollectionVersion.owner_id == user.id)
+
+def get_task_collection_version(db: Session, user: User) -> int:
+    return db.scalar(task_version_query(user)) or 0
+
+def status_change(old_status: str | None, new_status: str | None):
+    if old_status == new_status:
+        return {}
+    return {old_status: -1, new_status: 1}
+
 def create_task(db: Session, user: User, title: str, description: str, status: str = "todo"):
     task = Task(
         title=title,
@@ -11,59 +101,332 @@ def create_task(db: Session, user: User, title: str, description: str, status: s
         owner_id=user.id
     )
     db.add(task)
+    adjust_task_counters(db, user.id, {status: 1})
+    bump_task_version(db, user.id)
     db.commit()
+    tasks_changed(user.id)
     db.refresh(task)
     return task
 
-def get_tasks(
-    db: Session,
+def encode_task_cursor(task: Task) -> str:
+    return encode_cursor(task.created_at.isoformat(), str(task.id))
+
+def decode_task_cursor(cursor: str):
+    created_at, task_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(created_at), UUID(task_id)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def tasks_query(
     user: User,
     limit: int = 10,
     offset: int = 0,
-    status: str | None = None
+    status: str | None = None,
+    cursor: str | None = None,
+    fields=TASK_OUT_FIELDS
 ):
-    query = db.query(Task).filter(Task.owner_id == user.id)
+    # Core rows of just the requested TaskOut fields, plus created_at for the
+    # cursor: no ORM instances or identity map for a read-only page
+    columns = [getattr(Task, name) for name in fields]
+    query = select(*columns, Task.created_at).where(Task.owner_id == user.id)
 
     if status:
-        query = query.filter(Task.status == status)
+        query = query.where(Task.status == status)
+
+    # Keyset pagination: seek past the last (created_at, id) seen instead of
+    # reading and discarding `offset` rows. Served by idx_task_owner_created,
+    # or idx_task_owner_status_created when filtering by status.
+    if cursor:
+        query = query.where(
+            tuple_(Task.created_at, Task.id) < decode_task_cursor(cursor)
+        )
+        offset = 0
 
     return (
         query
-        .order_by(Task.created_at.desc())
+        .order_by(Task.created_at.desc(), Task.id.desc())
         .limit(limit)
         .offset(offset)
-        .all()
     )
 
+def encode_search_cursor(rank: float, row: Row) -> str:
+    # rank comes from search_rank(), so repr() round-trips it exactly
+    return encode_cursor(repr(rank), str(row.id))
 
-def get_task_or_404(db: Session, task_id, user: User):
-    task = (
-        db.query(Task)
-        .filter(Task.id == task_id, Task.owner_id == user.id)
-        .first()
-    )
-    if not task:
+def decode_search_cursor(cursor: str):
+    rank, task_id = decode_cursor(cursor, 2)
+    try:
+        rank = float(rank)
+        # Ranks are finite; "nan" or "inf" would only make the page empty or
+        # repeat the first one
+        if not math.isfinite(rank):
+            raise ValueError(rank)
+        return rank, UUID(task_id)
+    except (TypeError, ValueError):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
         )
+
+def search_rank(tsquery):
+    # ts_rank is real (float4). Selected, ordered and compared as float8 so
+    # the cursor's Python float is the exact value the next page compares
+    # against; a bound float8 never equals an uncast float4 rank.
+    return cast(func.ts_rank(Task.search_vector, tsquery), Double)
+
+def search_query(user: User, q: str, limit: int = 10, cursor: str | None = None, fields=TASK_OUT_FIELDS):
+    tsquery = func.websearch_to_tsquery("english", q)
+    rank = search_rank(tsquery)
+
+    # Matches come from idx_task_owner_search; only they are ranked
+    columns = [getattr(Task, name) for name in fields]
+    query = select(*columns, rank.label("rank")).where(
+        Task.owner_id == user.id,
+        Task.search_vector.bool_op("@@")(tsquery)
+    )
+    if cursor:
+        query = query.where(tuple_(rank, Task.id) < decode_search_cursor(cursor))
+
+    return query.order_by(rank.desc(), Task.id.desc()).limit(limit)
+
+def search_tasks(db: Session, user: User, q: str, limit: int = 10, cursor: str | None = None, fields=TASK_OUT_FIELDS):
+    return db.execute(search_query(user, q, limit, cursor, fields)).all()
+
+def get_tasks(
+    db: Session,
+    user: User,
+    limit: int = 10,
+    offset: int = 0,
+    status: str | None = None,
+    cursor: str | None = None,
+    fields=TASK_OUT_FIELDS
+):
+    return db.execute(tasks_query(user, limit, offset, status, cursor, fields)).all()
+
+
+def task_query(task_id, user: User, for_update: bool = False):
+    query = select(Task).where(Task.id == task_id, Task.owner_id == user.id)
+    # Writers lock the row so status transitions are counted exactly once
+    return query.with_for_update() if for_update else query
+
+def task_not_found():
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Task not found"
+    )
+
+def get_task_or_404(db: Session, task_id, user: User, for_update: bool = False):
+    task = db.scalars(task_query(task_id, user, for_update)).first()
+    if not task:
+        raise task_not_found()
     return task
 
-def update_task(db: Session, user: User, task_id, data):
-    task = get_task_or_404(db, task_id, user)
+def task_changes(data):
+    return {
+        field: getattr(data, field)
+        for field in ("title", "description", "status")
+        if getattr(data, field) is not None
+    }
+
+def apply_task_update(task: Task, data):
+    for field, value in task_changes(data).items():
+        setattr(task, field, value)
+    task.version += 1
 
-    if data.title is not None:
-        task.title = data.title
-    if data.description is not None:
-        task.description = data.description
-    if data.status is not None:
-        task.status = data.status
+def version_mismatch():
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Task was modified; fetch it again before updating"
+    )
+
+def conditional_update_query(user: User, task_id, data, expected_version: int):
+    # One statement: lock the row, read its old status for the counters and
+    # apply the change only if the client's version is still current
+    old = (
+        select(Task.id, Task.status)
+        .where(Task.id == task_id, Task.owner_id == user.id)
+        .with_for_update()
+        .subquery("old")
+    )
+    return (
+        update(Task)
+        .where(Task.id == old.c.id, Task.version == expected_version)
+        .values(**task_changes(data), version=Task.version + 1)
+        .returning(*TASK_OUT_COLUMNS, Task.version, old.c.status.label("old_status"))
+    )
+
+def task_exists_query(task_id, user: User):
+    return select(Task.id).where(Task.id == task_id, Task.owner_id == user.id)
+
+def update_task_if_match(db: Session, user: User, task_id, data, expected_version: int):
+    task = db.execute(
+        conditional_update_query(user, task_id, data, expected_version),
+        execution_options={"synchronize_session": False}
+    ).first()
+    if task is None:
+        # Only a failed precondition costs a second read
+        if db.scalar(task_exists_query(task_id, user)) is None:
+            raise task_not_found()
+        raise version_mismatch()
+
+    adjust_task_counters(db, user.id, status_change(task.old_status, task.status))
+    bump_task_version(db, user.id)
+    db.commit()
+    tasks_changed(user.id)
+    return task
+
+def update_task(db: Session, user: User, task_id, data, expected_version: int | None = None):
+    if expected_version is not None:
+        return update_task_if_match(db, user, task_id, data, expected_version)
+
+    task = get_task_or_404(db, task_id, user, for_update=True)
+    old_status = task.status
+    apply_task_update(task, data)
+    adjust_task_counters(db, user.id, status_change(old_status, task.status))
+    bump_task_version(db, user.id)
 
     db.commit()
+    tasks_changed(user.id)
     db.refresh(task)
     return task
 
 def delete_task(db: Session, user: User, task_id):
-    task = get_task_or_404(db, task_id, user)
+    task = get_task_or_404(db, task_id, user, for_update=True)
     db.delete(task)
-    db.commit()
\ No newline at end of file
+    adjust_task_counters(db, user.id, {task.status: -1})
+    bump_task_version(db, user.id)
+    db.commit()
+    tasks_changed(user.id)
+
+def summary_query(user: User):
+    return select(TaskCounter.status, TaskCounter.count).where(TaskCounter.owner_id == user.id)
+
+def summarize(rows):
+    summary = {task_status: 0 for task_status in TASK_STATUSES}
+    for row in rows:
+        summary[row.status] = row.count
+    summary["total"] = sum(summary.values())
+    return summary
+
+def get_task_summary(db: Session, user: User):
+    return summarize(db.execute(summary_query(user)))
+
+def task_out(row):
+    return {column.key: getattr(row, column.key) for column in TASK_OUT_COLUMNS}
+
+def batch_update_query(user: User, items):
+    changes = values(
+        column("id", String),
+        column("title", String),
+        column("description", String),
+        column("status", String),
+        name="changes"
+    ).data([
+        (str(item.id), item.title, item.description, item.status)
+        for item in items
+    ])
+    # Locked snapshot of the rows being changed, to read their old status
+    ids = cast([item.id for item in items], ARRAY(PGUUID(as_uuid=True)))
+    old = (
+        select(Task.id, Task.status)
+        .where(Task.owner_id == user.id, Task.id == any_(ids))
+        .with_for_update()
+        .subquery("old")
+    )
+    # NULL in a change row means "leave as is", like update_task
+    return (
+        update(Task)
+        .where(
+            Task.id == cast(changes.c.id, PGUUID(as_uuid=True)),
+            Task.id == old.c.id
+        )
+        .values(
+            title=func.coalesce(changes.c.title, Task.title),
+            description=func.coalesce(changes.c.description, Task.description),
+            status=func.coalesce(cast(changes.c.status, Task.status.type), Task.status),
+            version=Task.version + 1
+        )
+        .returning(*TASK_OUT_COLUMNS, old.c.status.label("old_status"))
+    )
+
+def batch_delete_query(user: User, task_ids):
+    ids = cast(list(task_ids), ARRAY(PGUUID(as_uuid=True)))
+    return (
+        delete(Task)
+        .where(Task.owner_id == user.id, Task.id == any_(ids))
+        .returning(Task.id, Task.status)
+    )
+
+def batch_tasks(db: Session, user: User, data):
+    """Apply a batch of creates, updates and deletes in one transaction.
+
+    Each operation kind is a single statement (multi-row INSERT, UPDATE ...
+    FROM VALUES, DELETE ... = ANY), scoped to the caller's tasks.
+    """
+    results = {"create": [], "update": [], "delete": []}
+    bulk = {"synchronize_session": False}
+    deltas = Counter()
+
+    if data.create:
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "title": item.title,
+                "description": item.description,
+                "status": item.status,
+                "owner_id": user.id,
+                "created_at": now,
+                "version": 1
+            }
+            for item in data.create
+        ]
+        created = {
+            row.id: row
+            for row in db.execute(
+                insert(Task).values(rows).returning(*TASK_OUT_COLUMNS)
+            )
+        }
+        results["create"] = [
+            {"id": row["id"], "status": "created", "task": task_out(created[row["id"]])}
+            for row in rows
+        ]
+        for row in rows:
+            deltas[row["status"]] += 1
+
+    if data.update:
+        updated = {
+            row.id: row
+            for row in db.execute(batch_update_query(user, data.update), execution_options=bulk)
+        }
+        for row in updated.values():
+            for task_status, delta in status_change(row.old_status, row.status).items():
+                deltas[task_status] += delta
+        results["update"] = [
+            {"id": item.id, "status": "updated", "task": task_out(updated[item.id])}
+            if item.id in updated
+            else {"id": item.id, "status": "not_found"}
+            for item in data.update
+        ]
+
+    if data.delete:
+        deleted = {
+            row.id: row.status
+            for row in db.execute(batch_delete_query(user, data.delete), execution_options=bulk)
+        }
+        for task_status in deleted.values():
+            deltas[task_status] -= 1
+        results["delete"] = [
+            {"id": task_id, "status": "deleted" if task_id in deleted else "not_found"}
+            for task_id in data.delete
+        ]
+
+    adjust_task_counters(db, user.id, deltas)
+    bump_task_version(db, user.id)
+    db.commit()
+    tasks_changed(user.id)
+    return results
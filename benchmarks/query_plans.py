@@ -0,0 +1,209 @@
+"""EXPLAIN every service query and fail on sequential scans and sorts.
+
+Seeds a user with --tasks tasks (plus a few smaller users and some refresh
+tokens) into the database in DATABASE_URL, which must be a local Postgres
+with migrations applied, then plans each query the services run. Seeded rows
+are left behind, so use a dedicated database.
+
+Plans are made with seq scans and sorts disabled: the planner then only
+falls back to them when no index can serve the query, so a failure means a
+missing or unusable index whatever the table sizes.
+
+Usage:
+    python -m benchmarks.query_plans [--tasks 20000] [--verbose]
+
+Exits with status 1 if any plan has a node it isn't allowed.
+"""
+import argparse
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.commands.purge_refresh_tokens import purge_batch_query
+from app.core.token_epochs import bumped_epochs_query
+from app.db.session import SessionLocal
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.auth_service import (
+    logout_query,
+    new_refresh_token,
+    refresh_token_state_query,
+    revoke_family_query,
+    revoke_token_query,
+    revoke_user_tokens_query,
+    rotate_refresh_token_query
+)
+from app.services.task_io import export_query, import_tasks
+from app.services.task_service import (
+    batch_delete_query,
+    batch_update_query,
+    conditional_update_query,
+    encode_search_cursor,
+    encode_task_cursor,
+    search_query,
+    summary_query,
+    task_counter_upsert,
+    task_exists_query,
+    task_query,
+    task_version_bump,
+    task_version_query,
+    tasks_query
+)
+
+FORBIDDEN = {"Seq Scan", "Sort", "Incremental Sort"}
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element, compiler, **kw):
+    sql = compiler.process(element.statement, **kw)
+    # Whatever the statement, executing this returns plan rows; DML flags
+    # would make SQLAlchemy discard them
+    compiler.isinsert = compiler.isupdate = compiler.isdelete = False
+    return "EXPLAIN (FORMAT JSON) " + sql
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(db, statement) -> dict:
+    # Planned only, never run, so DML changes nothing
+    plan = db.execute(Explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def describe(node) -> str:
+    relation = node.get("Relation Name")
+    return f"{node['Node Type']} on {relation}" if relation else node["Node Type"]
+
+
+def seed(db, task_count: int):
+    users = [
+        User(
+            email=f"plans-{uuid.uuid4().hex[:8]}-{i}@example.com",
+            hashed_password="!",
+            token_epoch=i % 2,
+            token_epoch_bumped_at=datetime.now(timezone.utc) - timedelta(minutes=i) if i % 2 else None
+        )
+        for i in range(20)
+    ]
+    db.add_all(users)
+    db.commit()
+
+    def rows(count):
+        statuses = ("todo", "in_progress", "done")
+        yield b"title,description,status\n"
+        for i in range(count):
+            yield f"Task {i},Seeded for query plans,{statuses[i % 3]}\n".encode()
+
+    owner, *others = users
+    import_tasks(owner.id, rows(task_count), "csv")
+    for user in others:
+        import_tasks(user.id, rows(max(task_count // 100, 10)), "csv")
+
+    for user in users:
+        for _ in range(20):
+            db.add(new_refresh_token(user.id)[1])
+    db.commit()
+    for table in ("users", "tasks", "task_counters", "task_collection_versions", "refresh_tokens"):
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+    return owner
+
+
+def service_queries(db, user: User) -> dict:
+    """name -> (statement, FORBIDDEN node types that query may still use)."""
+    task = db.execute(tasks_query(user, 1)).first()
+    task_cursor = encode_task_cursor(task)
+    search_cursor = encode_search_cursor(0.1, task)
+    token = db.scalars(select(RefreshToken).where(RefreshToken.user_id == user.id)).first()
+    # Only hashed into the statement, so any string plans the same
+    raw_token = "plan-only"
+    now = datetime.utcnow()
+    change = SimpleNamespace(id=task.id, title="Renamed", description=None, status="done")
+    successor = new_refresh_token(user.id, token.family_id)[1]
+
+    return {
+        "list tasks": (tasks_query(user, 100), set()),
+        "list tasks, offset": (tasks_query(user, 100, 500), set()),
+        "list tasks, cursor": (tasks_query(user, 100, cursor=task_cursor), set()),
+        "list tasks by status": (tasks_query(user, 100, status="done"), set()),
+        "list tasks by status, cursor": (tasks_query(user, 100, status="done", cursor=task_cursor), set()),
+        "export tasks": (export_query(user.id), set()),
+        "export tasks by status": (export_query(user.id, "in_progress"), set()),
+        # Ranking needs every match's score; only the top `limit` are kept
+        "search tasks": (search_query(user, "seeded -draft", 100), {"Sort"}),
+        "search tasks, cursor": (search_query(user, "seeded", 100, search_cursor), {"Sort"}),
+        "get task": (task_query(task.id, user), set()),
+        "get task for update": (task_query(task.id, user, for_update=True), set()),
+        "task exists": (task_exists_query(task.id, user), set()),
+        "conditional update": (conditional_update_query(user, task.id, change, 1), set()),
+        "batch update": (batch_update_query(user, [change]), set()),
+        "batch delete": (batch_delete_query(user, [task.id]), set()),
+        "task summary": (summary_query(user), set()),
+        "collection version": (task_version_query(user), set()),
+        "bump collection version": (task_version_bump(user.id), set()),
+        "adjust task counters": (task_counter_upsert(user.id, {"todo": 1, "done": -1}), set()),
+        "login lookup": (select(User).where(User.email == user.email), set()),
+        "refresh token state": (refresh_token_state_query(raw_token, token.id, user.id), set()),
+        "rotate refresh token": (rotate_refresh_token_query(raw_token, token.id, user.id, successor), set()),
+        "revoke refresh token": (revoke_token_query(token.id), set()),
+        "revoke token family": (revoke_family_query(token.family_id), set()),
+        "logout": (logout_query(raw_token, token.id), set()),
+        "logout everywhere": (revoke_user_tokens_query(user.id), set()),
+        "token epoch reload": (bumped_epochs_query(), set()),
+        "purge refresh tokens": (purge_batch_query(now, now - timedelta(hours=24), 1000), set())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a service query plans a seq scan or sort")
+    parser.add_argument("--tasks", type=int, default=20000, help="Tasks seeded for the user whose queries are planned")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = seed(db, args.tasks)
+        db.execute(text("SET enable_seqscan = off"))
+        db.execute(text("SET enable_sort = off"))
+        db.execute(text("SET enable_incremental_sort = off"))
+
+        failures = []
+        for name, (statement, allowed) in service_queries(db, user).items():
+            plan = explain(db, statement)
+            bad = [describe(node) for node in plan_nodes(plan) if node["Node Type"] in FORBIDDEN - allowed]
+            nodes = ", ".join(describe(node) for node in plan_nodes(plan))
+            print(f"{'FAIL' if bad else 'ok  '} {name}: {nodes if args.verbose or bad else ''}".rstrip(": "))
+            if bad:
+                failures.append(f"{name}: {', '.join(bad)}")
+        db.rollback()
+    finally:
+        db.close()
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+    print("No sequential scans or sorts", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
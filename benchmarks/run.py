@@ -0,0 +1,262 @@
+"""In-process benchmarks for the auth and task flows.
+
+Drives app.main:app through httpx's ASGI transport (no network, no server)
+against the database in DATABASE_URL, which must be a local Postgres with
+migrations applied. Benchmark users and tasks are left behind, so use a
+dedicated database.
+
+Usage:
+    python -m benchmarks.run --sizes 1000 100000 --concurrency 1 16 \\
+        --output results.json [--baseline baseline.json] [--tolerance 0.15]
+
+Exits with status 1 when --baseline is given and any operation's p95
+latency or throughput is worse than the baseline by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from jose import jwt
+
+from app.core.config import settings
+from app.main import app
+from app.services.task_io import import_tasks
+
+PASSWORD = "bench-password-123"
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2)
+    }
+
+
+async def measure(concurrency: int, count: int, send) -> dict:
+    """Run send(i) for i in range(count) from `concurrency` workers."""
+    latencies = []
+    errors = 0
+    next_index = iter(range(count))
+
+    async def worker():
+        nonlocal errors
+        for i in next_index:
+            started = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def register(client, email: str) -> dict:
+    response = await client.post("/auth/register", json={"email": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()
+
+
+def seed_tasks(owner_id, count: int):
+    # Same COPY path as POST /tasks/import, fed from a generator
+    statuses = ("todo", "in_progress", "done")
+
+    def rows():
+        yield b"title,description,status\n"
+        for i in range(count):
+            yield f"Task {i},Seeded for benchmarks,{statuses[i % 3]}\n".encode()
+
+    return import_tasks(owner_id, rows(), "csv")["accepted"]
+
+
+async def auth_flow(client, run_id: str, concurrency: int, requests: int) -> dict:
+    results = {}
+    emails = [f"bench-{run_id}-c{concurrency}-{i}@example.com" for i in range(requests)]
+
+    results["POST /auth/register"] = await measure(
+        concurrency, requests,
+        lambda i: client.post("/auth/register", json={"email": emails[i], "password": PASSWORD})
+    )
+
+    logins = []
+
+    async def login(i):
+        response = await client.post("/auth/login", data={"username": emails[i], "password": PASSWORD})
+        if response.status_code == 200:
+            logins.append(response.json()["refresh_token"])
+        return response
+
+    results["POST /auth/login"] = await measure(concurrency, requests, login)
+
+    # Each refresh rotates its own token, so requests never race each other
+    rotated = []
+
+    async def refresh(i):
+        response = await client.post("/auth/refresh", json={"refresh_token": logins[i]})
+        if response.status_code == 200:
+            rotated.append(response.json()["refresh_token"])
+        return response
+
+    results["POST /auth/refresh"] = await measure(concurrency, len(logins), refresh)
+    results["POST /auth/logout"] = await measure(
+        concurrency, len(rotated),
+        lambda i: client.post("/auth/logout", json={"refresh_token": rotated[i]})
+    )
+    return results
+
+
+async def task_flow(client, headers: dict, concurrency: int, requests: int) -> dict:
+    results = {}
+
+    first_page = await client.get("/tasks", params={"limit": 10}, headers=headers)
+    cursor = first_page.headers.get("X-Next-Cursor")
+
+    results["GET /tasks"] = await measure(
+        concurrency, requests,
+        lambda i: client.get("/tasks", params={"limit": 10}, headers=headers)
+    )
+    if cursor:
+        results["GET /tasks?cursor"] = await measure(
+            concurrency, requests,
+            lambda i: client.get("/tasks", params={"limit": 10, "cursor": cursor}, headers=headers)
+        )
+    results["GET /tasks?status"] = await measure(
+        concurrency, requests,
+        lambda i: client.get("/tasks", params={"limit": 10, "status": "in_progress"}, headers=headers)
+    )
+
+    created = []
+
+    async def create(i):
+        response = await client.post("/tasks", json={"title": f"Bench {i}"}, headers=headers)
+        if response.status_code == 200:
+            created.append(response.json()["id"])
+        return response
+
+    results["POST /tasks"] = await measure(concurrency, requests, create)
+    results["PUT /tasks/{task_id}"] = await measure(
+        concurrency, len(created),
+        lambda i: client.put(f"/tasks/{created[i]}", json={"status": "done"}, headers=headers)
+    )
+    # Deleting what we created keeps the dataset at its seeded size
+    results["DELETE /tasks/{task_id}"] = await measure(
+        concurrency, len(created),
+        lambda i: client.delete(f"/tasks/{created[i]}", headers=headers)
+    )
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size, by_concurrency in results["runs"].items():
+        for concurrency, operations in by_concurrency.items():
+            for operation, current in operations.items():
+                previous = baseline.get("runs", {}).get(size, {}).get(concurrency, {}).get(operation)
+                if not previous or not previous.get("requests") or not current.get("requests"):
+                    continue
+                where = f"{operation} [{size} tasks, concurrency {concurrency}]"
+                if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+                    regressions.append(f"{where}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+                if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+                    regressions.append(
+                        f"{where}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps"
+                    )
+    return regressions
+
+
+async def run(args) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "db_async": settings.DB_ASYNC,
+            "requests_per_operation": args.requests,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "runs": {}
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in args.sizes:
+                owner = await register(client, f"bench-{run_id}-owner-{size}@example.com")
+                headers = {"Authorization": f"Bearer {owner['access_token']}"}
+                owner_id = uuid.UUID(jwt.get_unverified_claims(owner["access_token"])["sub"])
+
+                print(f"Seeding {size} tasks...", file=sys.stderr)
+                await asyncio.to_thread(seed_tasks, owner_id, size)
+
+                by_concurrency = results["runs"].setdefault(str(size), {})
+                for concurrency in args.concurrency:
+                    print(f"{size} tasks, concurrency {concurrency}...", file=sys.stderr)
+                    operations = await task_flow(client, headers, concurrency, args.requests)
+                    if not args.skip_auth:
+                        operations.update(await auth_flow(client, run_id, concurrency, args.requests))
+                    by_concurrency[str(concurrency)] = operations
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark auth and task flows in-process")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Tasks seeded per user, one run each")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="Concurrent clients, one run each")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per operation")
+    parser.add_argument("--skip-auth", action="store_true", help="Only benchmark task routes")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
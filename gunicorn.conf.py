@@ -0,0 +1,45 @@
+# Loaded automatically by gunicorn from the working directory
+import os
+
+# Import app.main once in the master and fork it into the workers, instead
+# of every worker importing it again. GUNICORN_PRELOAD=false turns it off
+# (e.g. to reload code with HUP, which a preloaded master can't do).
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+
+def on_starting(server):
+    # Per-worker state that only works with one worker, unless shared
+    if server.cfg.workers <= 1:
+        return
+    from app.core.config import settings
+    if settings.READ_DATABASE_URL and settings.READ_YOUR_WRITES_BACKEND != "redis":
+        raise RuntimeError(
+            "READ_DATABASE_URL with more than one worker needs READ_YOUR_WRITES_BACKEND=redis, "
+            "or a user's reads may miss their own writes"
+        )
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        raise RuntimeError(
+            "RESPONSE_CACHE_BACKEND=memory with more than one worker serves stale pages "
+            "after writes on other workers; use redis"
+        )
+
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    # Already imported by the master; nothing here imports the app afresh
+    from app.core.startup import startup_timer
+    from app.db.replicas import replicas
+    from app.db.session import dispose_after_fork
+    # Pooled connections must never be shared between processes
+    dispose_after_fork()
+    replicas.dispose_after_fork()
+    startup_timer.forked()
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (in-flight requests, pool
+    # connections) from the aggregated /metrics
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
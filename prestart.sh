@@ -1,5 +1,10 @@
 #!/bin/sh
 
-echo "Running database migrations..."
-alembic upgrade head
-echo "Migrations complete!"
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    # Samples from a previous run would be merged into the new one's
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+# Returns straight away when the database is already at head
+python -m app.commands.migrate
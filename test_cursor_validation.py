@@ -0,0 +1,55 @@
+"""Tampered cursor checks; no server or database needed.
+
+Run with `python test_cursor_validation.py` (or pytest).
+"""
+import base64
+import json
+import uuid
+
+from fastapi import HTTPException
+
+from app.core.pagination import encode_cursor
+from app.services.task_service import decode_search_cursor, decode_task_cursor
+
+
+def forge(*values) -> str:
+    # What a client editing the decoded JSON by hand would send back
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def assert_rejected(decode, cursor: str):
+    try:
+        decode(cursor)
+    except HTTPException as exc:
+        assert exc.status_code == 400, exc.status_code
+    else:
+        raise AssertionError(f"{cursor!r} was accepted")
+
+
+def test_task_cursor_rejects_non_string_values():
+    task_id = str(uuid.uuid4())
+    for values in (("2024-01-01T00:00:00", 5), (None, task_id), (20240101, task_id), ([], {})):
+        assert_rejected(decode_task_cursor, forge(*values))
+    assert_rejected(decode_task_cursor, forge("2024-01-01T00:00:00"))
+    assert_rejected(decode_task_cursor, "not base64 json")
+
+
+def test_search_cursor_rejects_non_string_and_non_finite_values():
+    task_id = str(uuid.uuid4())
+    for values in ((0.5, task_id), ("0.5", 5), ("0.5", None)):
+        assert_rejected(decode_search_cursor, forge(*values))
+    for rank in ("nan", "inf", "-inf", "1e999"):
+        assert_rejected(decode_search_cursor, encode_cursor(rank, task_id))
+
+
+def test_valid_cursors_still_decode():
+    task_id = uuid.uuid4()
+    assert decode_task_cursor(encode_cursor("2024-01-01T00:00:00", str(task_id)))[1] == task_id
+    assert decode_search_cursor(encode_cursor("0.5", str(task_id))) == (0.5, task_id)
+
+
+if __name__ == "__main__":
+    test_task_cursor_rejects_non_string_values()
+    test_search_cursor_rejects_non_string_and_non_finite_values()
+    test_valid_cursors_still_decode()
+    print("✅ Cursor validation tests passed")
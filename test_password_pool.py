@@ -0,0 +1,35 @@
+"""Password hash pool recovery checks; no server or database needed.
+
+Run with `python test_password_pool.py` (or pytest).
+"""
+import os
+import signal
+import time
+
+from app.core.password_pool import PasswordHashPool, bcrypt_hash, bcrypt_verify
+
+
+def test_pool_recovers_after_a_worker_dies():
+    pool = PasswordHashPool(workers=1, queue_depth=4)
+    try:
+        hashed = pool.run(bcrypt_hash, "secret")
+        # Stands in for the OOM killer
+        for pid in list(pool._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        time.sleep(0.5)
+
+        assert pool.run(bcrypt_verify, "secret", hashed)
+        assert pool.run(bcrypt_verify, "secret", pool.run(bcrypt_hash, "secret"))
+
+        stats = pool.stats()
+        assert stats["pool_restarts"] == 1
+        assert stats["failed"] == 1
+        assert stats["completed"] == 4
+        assert stats["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_pool_recovers_after_a_worker_dies()
+    print("✅ Password pool tests passed")
@@ -0,0 +1,89 @@
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+parser = argparse.ArgumentParser(description="Refresh rotation race and latency check")
+parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+parser.add_argument("--compare", help="Base URL of a server to compare refresh latency against (e.g. the previous release)")
+parser.add_argument("--racers", type=int, default=20)
+parser.add_argument("--rotations", type=int, default=200)
+args = parser.parse_args()
+
+login_data = {"username": "testuser@example.com", "password": "testpass123"}
+
+def login(base_url):
+    response = requests.post(f"{base_url}/auth/login", data=login_data)
+    if response.status_code != 200:
+        requests.post(f"{base_url}/auth/register", json={"email": login_data["username"], "password": login_data["password"]})
+        response = requests.post(f"{base_url}/auth/login", data=login_data)
+    response.raise_for_status()
+    return response.json()["refresh_token"]
+
+def refresh(base_url, session, refresh_token):
+    return session.post(f"{base_url}/auth/refresh", json={"refresh_token": refresh_token})
+
+def race(base_url, racers):
+    refresh_token = login(base_url)
+    barrier = threading.Barrier(racers)
+
+    def attempt(_):
+        with requests.Session() as session:
+            barrier.wait()
+            return refresh(base_url, session, refresh_token)
+
+    with ThreadPoolExecutor(racers) as pool:
+        return list(pool.map(attempt, range(racers)))
+
+def refresh_latencies(base_url, rotations):
+    refresh_token = login(base_url)
+    latencies = []
+    with requests.Session() as session:
+        for _ in range(rotations):
+            started = time.perf_counter()
+            response = refresh(base_url, session, refresh_token)
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            refresh_token = response.json()["refresh_token"]
+    return latencies
+
+def describe(latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return p50, p95
+
+print("=" * 60)
+print("🔁 REFRESH ROTATION - Concurrency & Latency")
+print("=" * 60)
+
+print(f"\n1️⃣ {args.racers} concurrent refreshes with the same token → exactly one 200")
+responses = race(args.base_url, args.racers)
+winners = [r for r in responses if r.status_code == 200]
+losers = [r for r in responses if r.status_code == 401]
+print(f"   200: {len(winners)}  401: {len(losers)}  other: {len(responses) - len(winners) - len(losers)}")
+race_passed = len(winners) == 1 and len(losers) == args.racers - 1
+print("   ✅ PASS: exactly one winner" if race_passed else "   ❌ FAIL: expected exactly one winner")
+
+print("\n2️⃣ Winner's token after the replay → ❌ 401 (family revoked)")
+family_passed = False
+if winners:
+    followup = refresh(args.base_url, requests, winners[0].json()["refresh_token"])
+    family_passed = followup.status_code == 401
+    print(f"   Status: {followup.status_code}")
+print("   ✅ PASS: token family revoked on reuse" if family_passed else "   ❌ FAIL: expected 401")
+
+print(f"\n3️⃣ Latency over {args.rotations} sequential rotations")
+p50, p95 = describe(refresh_latencies(args.base_url, args.rotations))
+print(f"   {args.base_url}: p50 {p50:.1f} ms  p95 {p95:.1f} ms")
+if args.compare:
+    base_p50, base_p95 = describe(refresh_latencies(args.compare, args.rotations))
+    print(f"   {args.compare}: p50 {base_p50:.1f} ms  p95 {base_p95:.1f} ms")
+    print(f"   p50 improvement: {(1 - p50 / base_p50) * 100:.1f}%  p95 improvement: {(1 - p95 / base_p95) * 100:.1f}%")
+
+print("\n" + "=" * 60)
+print("🎉 ALL TESTS PASSED!" if race_passed and family_passed else "❌ SOME TESTS FAILED")
+print("=" * 60)
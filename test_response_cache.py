@@ -0,0 +1,50 @@
+"""Redis response cache generation checks against fakeredis; no server needed.
+
+Run with `python test_response_cache.py` (or pytest).
+"""
+import fakeredis
+
+from app.core.response_cache import RedisCacheBackend, ResponseCache
+
+
+def backend(ttl: float = 30) -> RedisCacheBackend:
+    return RedisCacheBackend(fakeredis.FakeRedis(), ttl)
+
+
+def test_generation_keys_expire_after_the_entries():
+    redis = backend()
+    redis.generation("alice")
+    redis.bump("bob")
+    redis.set("tasks:bob:1:limit=10", b"[]")
+    entry_ttl = redis.client.ttl("taskapi:tasks:bob:1:limit=10")
+    for scope in ("alice", "bob"):
+        assert entry_ttl < redis.client.ttl(f"taskapi:gen:{scope}") <= redis.generation_ttl
+
+
+def test_expired_generation_is_never_reused():
+    redis = backend()
+    seen = set()
+    for _ in range(5):
+        seen.add(redis.generation("alice"))
+        redis.bump("alice")
+        seen.add(redis.generation("alice"))
+        # As if the generation key had expired
+        redis.client.delete("taskapi:gen:alice")
+        assert redis.generation("alice") not in seen
+
+
+def test_write_retires_cached_pages():
+    cache = ResponseCache(backend())
+    key = cache.key("alice", "limit=10")
+    cache.set(key, b"[]")
+    assert cache.get(cache.key("alice", "limit=10")) == b"[]"
+    cache.invalidate("alice")
+    assert cache.key("alice", "limit=10") != key
+    assert cache.get(cache.key("alice", "limit=10")) is None
+
+
+if __name__ == "__main__":
+    test_generation_keys_expire_after_the_entries()
+    test_expired_generation_is_never_reused()
+    test_write_retires_cached_pages()
+    print("✅ Response cache tests passed")
@@ -0,0 +1,39 @@
+"""Search cursor round-trip checks; no server or database needed.
+
+Run with `python test_search_cursor.py` (or pytest).
+"""
+import struct
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.task_service import decode_search_cursor, encode_search_cursor, search_query
+
+
+def float4(value: float) -> float:
+    # What ts_rank (real) returns, widened as Postgres does for float8
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def test_cursor_round_trips_rank_and_id():
+    for rank in (float4(0.0607927), float4(1e-20), float4(0.1), 0.0):
+        row = SimpleNamespace(id=uuid.uuid4())
+        assert decode_search_cursor(encode_search_cursor(rank, row)) == (rank, row.id)
+
+
+def test_rank_compared_as_float8_everywhere():
+    user = SimpleNamespace(id=uuid.uuid4())
+    row = SimpleNamespace(id=uuid.uuid4())
+    cursor = encode_search_cursor(float4(0.1), row)
+    sql = str(search_query(user, "report", 10, cursor).compile(dialect=postgresql.dialect()))
+    # Select list, cursor predicate and ORDER BY
+    assert sql.count("CAST(ts_rank(tasks.search_vector, websearch_to_tsquery(") == 3
+    assert "AND (CAST(ts_rank(" in sql
+    assert "AS DOUBLE PRECISION), tasks.id) <" in sql
+
+
+if __name__ == "__main__":
+    test_cursor_round_trips_rank_and_id()
+    test_rank_compared_as_float8_everywhere()
+    print("✅ Search cursor tests passed")